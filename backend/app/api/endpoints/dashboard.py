@@ -2,12 +2,14 @@
 Dashboard API Endpoints backed by MongoDB.
 """
 
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import List
 
 from fastapi import APIRouter, Depends
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 
+from app.core.cache import get_or_compute_stats
 from app.db import schemas
 from app.db.mongo import get_database
 from app.api.endpoints.fridge import _serialize_fridge_item  # reuse serializer
@@ -15,6 +17,20 @@ from app.api.endpoints.fridge import _serialize_fridge_item  # reuse serializer
 
 router = APIRouter()
 DEFAULT_USER_ID = "default-user"
+_SEVEN_DAYS = timedelta(days=7)
+
+# Static query shapes, built once instead of per request
+_USER_FILTER = {"user_id": DEFAULT_USER_ID}
+_FRIDGE_COUNTS_PIPELINE = [
+    {"$match": _USER_FILTER},
+    {
+        "$facet": {
+            "total": [{"$count": "n"}],
+            "fresh": [{"$match": {"freshness_status": "fresh"}}, {"$count": "n"}],
+            "spoiled": [{"$match": {"freshness_status": "spoiled"}}, {"$count": "n"}],
+        }
+    },
+]
 
 
 def _serialize_fridge_item_dashboard(doc: dict) -> schemas.FridgeItem:
@@ -22,7 +38,7 @@ def _serialize_fridge_item_dashboard(doc: dict) -> schemas.FridgeItem:
 
 
 def _serialize_expiring_item(doc: dict, days_until: int) -> schemas.ExpiringItem:
-    return schemas.ExpiringItem(
+    return schemas.ExpiringItem.model_construct(
         id=str(doc["_id"]),
         name=doc.get("name", ""),
         type="pantry",
@@ -31,26 +47,43 @@ def _serialize_expiring_item(doc: dict, days_until: int) -> schemas.ExpiringItem
     )
 
 
+def _facet_count(facet: dict, key: str) -> int:
+    """Read a `$count` bucket from a `$facet` stage, defaulting to zero."""
+    bucket = facet.get(key) or []
+    return bucket[0]["n"] if bucket else 0
+
+
 @router.get("/stats", response_model=schemas.DashboardStats)
-async def get_dashboard_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
-    """Return aggregated dashboard counters."""
-    user_filter = {"user_id": DEFAULT_USER_ID}
+async def get_dashboard_stats(db: AsyncDatabase = Depends(get_database)):
+    """Return aggregated dashboard counters (cached per user for a few seconds)."""
+    return await get_or_compute_stats(DEFAULT_USER_ID, lambda: _compute_dashboard_stats(db))
+
 
-    total_fridge = await db.fridge_items.count_documents(user_filter)
-    fresh_items = await db.fridge_items.count_documents({**user_filter, "freshness_status": "fresh"})
-    spoiled_items = await db.fridge_items.count_documents({**user_filter, "freshness_status": "spoiled"})
+async def _fridge_counts(db: AsyncDatabase) -> List[dict]:
+    # One pipeline for the three fridge counters instead of three round-trips
+    cursor = await db.fridge_items.aggregate(_FRIDGE_COUNTS_PIPELINE)
+    return await cursor.to_list(length=1)
 
-    total_pantry = await db.pantry_items.count_documents(user_filter)
 
-    now = datetime.utcnow()
-    deadline = now + timedelta(days=7)
+async def _compute_dashboard_stats(db: AsyncDatabase) -> schemas.DashboardStats:
+    now = datetime.now(timezone.utc)
+    # Depends on the current time, so it is the one filter built per request
     expiring_filter = {
-        **user_filter,
-        "expiry_date": {"$gte": now, "$lte": deadline},
+        "user_id": DEFAULT_USER_ID,
+        "expiry_date": {"$gte": now, "$lte": now + _SEVEN_DAYS},
     }
-    expiring_soon = await db.pantry_items.count_documents(expiring_filter)
 
-    favorites_count = await db.favorite_recipes.count_documents({"user_id": DEFAULT_USER_ID})
+    facet_result, total_pantry, expiring_soon, favorites_count = await asyncio.gather(
+        _fridge_counts(db),
+        db.pantry_items.count_documents(_USER_FILTER),
+        db.pantry_items.count_documents(expiring_filter),
+        db.favorite_recipes.count_documents(_USER_FILTER),
+    )
+
+    counts = facet_result[0] if facet_result else {}
+    total_fridge = _facet_count(counts, "total")
+    fresh_items = _facet_count(counts, "fresh")
+    spoiled_items = _facet_count(counts, "spoiled")
 
     return schemas.DashboardStats(
         total_fridge_items=total_fridge,
@@ -62,34 +95,57 @@ async def get_dashboard_stats(db: AsyncIOMotorDatabase = Depends(get_database)):
     )
 
 
-@router.get("/expiring-items", response_model=List[schemas.ExpiringItem])
-async def get_expiring_items(days: int = 7, db: AsyncIOMotorDatabase = Depends(get_database)):
+@router.get(
+    "/expiring-items",
+    response_model=List[schemas.ExpiringItem],
+    response_model_exclude_unset=True,
+)
+async def get_expiring_items(days: int = 7, db: AsyncDatabase = Depends(get_database)):
     """Return pantry items expiring within the specified number of days."""
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     deadline = now + timedelta(days=days)
 
-    cursor = db.pantry_items.find(
-        {
-            "user_id": DEFAULT_USER_ID,
-            "expiry_date": {"$gte": now, "$lte": deadline},
-        }
+    cursor = await db.pantry_items.aggregate(
+        [
+            {
+                "$match": {
+                    "user_id": DEFAULT_USER_ID,
+                    "expiry_date": {"$gte": now, "$lte": deadline},
+                }
+            },
+            {"$sort": {"expiry_date": 1}},
+            {
+                "$project": {
+                    "name": 1,
+                    "expiry_date": 1,
+                    "days_until_expiry": {
+                        "$max": [
+                            0,
+                            {
+                                "$dateDiff": {
+                                    "startDate": "$$NOW",
+                                    "endDate": "$expiry_date",
+                                    "unit": "day",
+                                }
+                            },
+                        ]
+                    },
+                }
+            },
+        ]
     )
-    items: List[schemas.ExpiringItem] = []
-    async for doc in cursor:
-        expiry_date = doc.get("expiry_date")
-        if not expiry_date:
-            continue
-        days_until = max(0, (expiry_date - now).days)
-        items.append(_serialize_expiring_item(doc, days_until))
-
-    items.sort(key=lambda x: x.days_until_expiry)
-    return items
+    docs = await cursor.to_list(length=None)
+    return [_serialize_expiring_item(doc, doc["days_until_expiry"]) for doc in docs]
 
 
-@router.get("/recent-scans", response_model=List[schemas.FridgeItem])
+@router.get(
+    "/recent-scans",
+    response_model=List[schemas.FridgeItem],
+    response_model_exclude_unset=True,
+)
 async def get_recent_scans(
     limit: int = 10,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Return the most recent fridge scans."""
     cursor = (
@@ -97,10 +153,8 @@ async def get_recent_scans(
         .sort("detected_date", -1)
         .limit(limit)
     )
-    items: List[schemas.FridgeItem] = []
-    async for doc in cursor:
-        items.append(_serialize_fridge_item_dashboard(doc))
-    return items
+    docs = await cursor.to_list(length=limit)
+    return [_serialize_fridge_item_dashboard(doc) for doc in docs]
 
 
 @router.post("/shopping-list/generate", response_model=dict)
@@ -1,13 +1,17 @@
 """Fridge Scanner API Endpoints backed by MongoDB."""
 
-from datetime import datetime
+import asyncio
+from datetime import datetime, timezone
 import logging
 from typing import List, Optional
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
 
+from app.core.cache import invalidate_stats
+from app.core.config import settings
 from app.db import schemas
 from app.db.mongo import get_database
 from app.services.detection_service import (
@@ -20,6 +24,7 @@ LOGGER = logging.getLogger(__name__)
 
 router = APIRouter()
 DEFAULT_USER_ID = "default-user"
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
 
 
 def _object_id(item_id: str) -> ObjectId:
@@ -28,6 +33,39 @@ def _object_id(item_id: str) -> ObjectId:
     return ObjectId(item_id)
 
 
+def _item_filter(item_id: str) -> dict:
+    return {"_id": _object_id(item_id), "user_id": DEFAULT_USER_ID}
+
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """Read an upload in chunks, rejecting it as soon as it exceeds the size cap."""
+    chunks: List[bytes] = []
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > settings.MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Uploaded image is too large.")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _check_freshness_batch(
+    detection_service: DetectionService, image_bytes: bytes, items: List[dict]
+) -> List[str]:
+    """Run the freshness check for all items of one model in a worker thread."""
+    if not items:
+        return []
+    try:
+        results = await asyncio.to_thread(
+            detection_service.check_freshness_mock_batch,
+            image_bytes,
+            [item["name"] for item in items],
+        )
+        return [freshness for freshness, _ in results]
+    except Exception:
+        return [schemas.FreshnessStatus.UNKNOWN.value] * len(items)
+
+
 def _serialize_fridge_item(doc: dict) -> schemas.FridgeItem:
     if not doc:
         raise ValueError("Document cannot be None")
@@ -38,7 +76,8 @@ def _serialize_fridge_item(doc: dict) -> schemas.FridgeItem:
     except ValueError:
         freshness_status = schemas.FreshnessStatus.UNKNOWN
 
-    return schemas.FridgeItem(
+    # Documents come from our own collection, so skip re-validation
+    return schemas.FridgeItem.model_construct(
         id=str(doc["_id"]),
         user_id=doc["user_id"],
         name=doc.get("name", ""),
@@ -55,19 +94,20 @@ def _serialize_fridge_item(doc: dict) -> schemas.FridgeItem:
 @router.post("/scan", response_model=schemas.DetectionResult)
 async def scan_fridge(
     file: UploadFile = File(...),
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     detection_service: DetectionService = Depends(get_detection_service),
 ):
     """
     Scan a fridge image, detect ingredients, store results, and return them.
     """
-    image_bytes = await file.read()
+    image_bytes = await _read_upload(file)
     
-    # Get results from both models separately
+    # Get results from both models separately, running them concurrently; each
+    # model batches this scan together with any others arriving at the same time,
+    # and re-scans of an identical image are served from the detection memo
     try:
-        both_models_result = detection_service.detect_ingredients_both_models(image_bytes)
-        model1_items = both_models_result.get("model1", [])
-        model2_items = both_models_result.get("model2", [])
+        both = await detection_service.detect_ingredients_both_models_async(image_bytes)
+        model1_items, model2_items = both["model1"], both["model2"]
         
         # Use model1 results for database storage (or merge if preferred)
         detected_items = model1_items if model1_items else model2_items
@@ -77,7 +117,15 @@ async def scan_fridge(
         LOGGER.exception("Unexpected error during detection: %s", exc)
         raise HTTPException(status_code=500, detail="Failed to process image.") from exc
 
-    now = datetime.utcnow()
+    if not model1_items and not model2_items:
+        return schemas.DetectionResult(items=[], total_detected=0, message="No items detected")
+
+    model1_freshness, model2_freshness = await asyncio.gather(
+        _check_freshness_batch(detection_service, image_bytes, model1_items),
+        _check_freshness_batch(detection_service, image_bytes, model2_items),
+    )
+
+    now = datetime.now(timezone.utc)
     documents = []
     serialized_items: List[schemas.FridgeItem] = []
     model1_serialized: List[schemas.FridgeItem] = []
@@ -85,13 +133,7 @@ async def scan_fridge(
 
     # Process model1 results
     for idx, item_data in enumerate(model1_items):
-        try:
-            freshness, _ = detection_service.check_freshness_mock(
-                image_bytes, item_data["name"]
-            )
-        except Exception:
-            freshness = schemas.FreshnessStatus.UNKNOWN.value
-
+        freshness = model1_freshness[idx]
         document = {
             "user_id": DEFAULT_USER_ID,
             "name": item_data["name"],
@@ -120,13 +162,7 @@ async def scan_fridge(
 
     # Process model2 results (for display only, not stored in DB)
     for idx, item_data in enumerate(model2_items):
-        try:
-            freshness, _ = detection_service.check_freshness_mock(
-                image_bytes, item_data["name"]
-            )
-        except Exception:
-            freshness = schemas.FreshnessStatus.UNKNOWN.value
-
+        freshness = model2_freshness[idx]
         model2_serialized.append(
             schemas.FridgeItem(
                 id=f"temp-model2-{idx}",
@@ -143,12 +179,13 @@ async def scan_fridge(
 
     # Store model1 results in database (or merge logic here)
     if documents:
-        result = await db.fridge_items.insert_many(documents)
-        inserted_docs = await db.fridge_items.find(
-            {"_id": {"$in": result.inserted_ids}}
-        ).to_list(length=len(result.inserted_ids))
+        # Detections are independent, so let the server insert them unordered
+        result = await db.fridge_items.insert_many(documents, ordered=False)
+        invalidate_stats(DEFAULT_USER_ID)
 
-        for doc in inserted_docs:
+        # The documents are already in memory; no need to read them back
+        for obj_id, doc in zip(result.inserted_ids, documents):
+            doc["_id"] = obj_id
             serialized_items.append(_serialize_fridge_item(doc))
 
     return schemas.DetectionResult(
@@ -164,12 +201,16 @@ async def scan_fridge(
     )
 
 
-@router.get("/items", response_model=List[schemas.FridgeItem])
+@router.get(
+    "/items",
+    response_model=List[schemas.FridgeItem],
+    response_model_exclude_unset=True,
+)
 async def get_fridge_items(
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Return paginated fridge items for the default user."""
     query: dict = {"user_id": DEFAULT_USER_ID}
@@ -183,21 +224,17 @@ async def get_fridge_items(
         .limit(limit)
     )
 
-    items: List[schemas.FridgeItem] = []
-    async for doc in cursor:
-        items.append(_serialize_fridge_item(doc))
-    return items
+    docs = await cursor.to_list(length=limit or None)
+    return [_serialize_fridge_item(doc) for doc in docs]
 
 
 @router.get("/items/{item_id}", response_model=schemas.FridgeItem)
 async def get_fridge_item(
     item_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Return a single fridge item."""
-    doc = await db.fridge_items.find_one(
-        {"_id": _object_id(item_id), "user_id": DEFAULT_USER_ID}
-    )
+    doc = await db.fridge_items.find_one(_item_filter(item_id))
     if not doc:
         raise HTTPException(status_code=404, detail="Item not found")
     return _serialize_fridge_item(doc)
@@ -207,46 +244,44 @@ async def get_fridge_item(
 async def update_fridge_item(
     item_id: str,
     item_update: schemas.FridgeItemUpdate,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Update fields on a fridge item."""
+    item_filter = _item_filter(item_id)
     update_data = item_update.dict(exclude_unset=True)
     if not update_data:
-        return await get_fridge_item(item_id, db)
-
-    result = await db.fridge_items.update_one(
-        {"_id": _object_id(item_id), "user_id": DEFAULT_USER_ID},
-        {"$set": update_data},
-    )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Item not found")
-
-    doc = await db.fridge_items.find_one(
-        {"_id": _object_id(item_id), "user_id": DEFAULT_USER_ID}
-    )
-    if not doc:
+        doc = await db.fridge_items.find_one(item_filter)
+    else:
+        doc = await db.fridge_items.find_one_and_update(
+            item_filter,
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
+        )
+    if doc is None:
         raise HTTPException(status_code=404, detail="Item not found")
+    if update_data:
+        invalidate_stats(DEFAULT_USER_ID)
     return _serialize_fridge_item(doc)
 
 
 @router.delete("/items/{item_id}")
 async def delete_fridge_item(
     item_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Delete a single fridge item."""
-    result = await db.fridge_items.delete_one(
-        {"_id": _object_id(item_id), "user_id": DEFAULT_USER_ID}
-    )
+    result = await db.fridge_items.delete_one(_item_filter(item_id))
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Item not found")
+    invalidate_stats(DEFAULT_USER_ID)
     return {"message": "Item deleted successfully"}
 
 
 @router.delete("/items")
-async def clear_all_fridge_items(db: AsyncIOMotorDatabase = Depends(get_database)):
+async def clear_all_fridge_items(db: AsyncDatabase = Depends(get_database)):
     """Delete every fridge item for the default user."""
     result = await db.fridge_items.delete_many({"user_id": DEFAULT_USER_ID})
+    invalidate_stats(DEFAULT_USER_ID)
     return {"message": f"Cleared {result.deleted_count} items from fridge"}
 
 
@@ -2,12 +2,14 @@
 Nutrition API Endpoints powered by Edamam Nutrition Analysis.
 """
 
-from datetime import datetime, timedelta
-from typing import List
+from datetime import date as date_type, datetime, time, timedelta, timezone
+from functools import lru_cache
+import hashlib
+from typing import List, Tuple
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 
 from app.db import schemas
 from app.db.mongo import get_database
@@ -22,6 +24,17 @@ from app.services.nutrition_service import (
 router = APIRouter()
 DEFAULT_USER_ID = "default-user"
 
+# NutritionInfo field -> Edamam totalNutrients tag (calories are top-level)
+NUTRIENT_MAP = (
+    ("calories", None),
+    ("protein", "PROCNT"),
+    ("carbs", "CHOCDF"),
+    ("fats", "FAT"),
+    ("fiber", "FIBTG"),
+    ("sugar", "SUGAR"),
+    ("sodium", "NA"),
+)
+
 
 def _build_ingredient_lines(recipe: dict) -> List[str]:
     """Convert recipe ingredient objects into strings for Edamam."""
@@ -44,42 +57,45 @@ def _build_ingredient_lines(recipe: dict) -> List[str]:
     return [line for line in lines if line]
 
 
+@lru_cache(maxsize=64)
+def _day_bounds(date_str: str) -> Tuple[datetime, datetime, date_type]:
+    """Parse an ISO date into its UTC [start, end) bounds; raises ValueError."""
+    target_date = datetime.fromisoformat(date_str).date()
+    start_dt = datetime.combine(target_date, time.min, tzinfo=timezone.utc)
+    return start_dt, start_dt + timedelta(days=1), target_date
+
+
+def _nutrition_cache_key(ingredient_lines: List[str]) -> str:
+    """Stable cache key for an ingredient list (order-insensitive)."""
+    return hashlib.sha1("\n".join(sorted(ingredient_lines)).encode("utf-8")).hexdigest()
+
+
 def _parse_nutrition_response(data: dict, servings: float) -> schemas.NutritionResponse:
     base_servings = data.get("yield") or 1
     total_nutrients = data.get("totalNutrients") or {}
 
-    def nutrient_amount(tag: str) -> float:
-        return float(total_nutrients.get(tag, {}).get("quantity", 0.0))
-
     total_calories = float(data.get("calories", 0.0))
     per_serving_factor = 1 / base_servings if base_servings else 1
 
-    per_serving = schemas.NutritionInfo(
-        calories=round(total_calories * per_serving_factor, 2),
-        protein=round(nutrient_amount("PROCNT") * per_serving_factor, 2),
-        carbs=round(nutrient_amount("CHOCDF") * per_serving_factor, 2),
-        fats=round(nutrient_amount("FAT") * per_serving_factor, 2),
-        fiber=round(nutrient_amount("FIBTG") * per_serving_factor, 2),
-        sugar=round(nutrient_amount("SUGAR") * per_serving_factor, 2),
-        sodium=round(nutrient_amount("NA") * per_serving_factor, 2),
-    )
-
-    total_multiplier = servings
-    total = schemas.NutritionInfo(
-        calories=round(per_serving.calories * total_multiplier, 2),
-        protein=round(per_serving.protein * total_multiplier, 2),
-        carbs=round(per_serving.carbs * total_multiplier, 2),
-        fats=round(per_serving.fats * total_multiplier, 2),
-        fiber=round((per_serving.fiber or 0) * total_multiplier, 2) if per_serving.fiber is not None else None,
-        sugar=round((per_serving.sugar or 0) * total_multiplier, 2) if per_serving.sugar is not None else None,
-        sodium=round((per_serving.sodium or 0) * total_multiplier, 2) if per_serving.sodium is not None else None,
-    )
+    per_serving = {
+        field: round(
+            (
+                total_calories
+                if tag is None
+                else float(total_nutrients.get(tag, {}).get("quantity", 0.0))
+            )
+            * per_serving_factor,
+            2,
+        )
+        for field, tag in NUTRIENT_MAP
+    }
+    total = {field: round(value * servings, 2) for field, value in per_serving.items()}
 
-    return schemas.NutritionResponse(
+    return schemas.NutritionResponse.model_construct(
         recipe_id="",
         servings=int(servings),
-        per_serving=per_serving,
-        total=total,
+        per_serving=schemas.NutritionInfo.model_construct(**per_serving),
+        total=schemas.NutritionInfo.model_construct(**total),
     )
 
 
@@ -87,12 +103,14 @@ def _parse_nutrition_response(data: dict, servings: float) -> schemas.NutritionR
 async def get_recipe_nutrition(
     recipe_id: str,
     servings: float = 1,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     recipe_service: RecipeService = Depends(get_recipe_service),
     nutrition_service: NutritionService = Depends(get_nutrition_service),
 ):
     """Return nutrition analysis for a saved recipe."""
-    recipe_doc = await db.recipes.find_one({"external_id": str(recipe_id)})
+    recipe_doc = await db.recipes.find_one(
+        {"external_id": str(recipe_id)}, {"title": 1, "ingredients": 1, "_id": 0}
+    )
     if not recipe_doc:
         recipe = await recipe_service.get_recipe_details(recipe_id)
         if not recipe:
@@ -107,20 +125,32 @@ async def get_recipe_nutrition(
     if not ingredient_lines:
         raise HTTPException(status_code=400, detail="Recipe does not contain ingredient details.")
 
-    try:
-        data = await nutrition_service.analyze_ingredients(
-            recipe_doc.get("title") or "FridgeScan Recipe",
-            ingredient_lines,
+    cache_key = _nutrition_cache_key(ingredient_lines)
+    cached = await db.nutrition_cache.find_one({"key": cache_key}, {"data": 1, "_id": 0})
+    if cached:
+        data = cached["data"]
+    else:
+        try:
+            data = await nutrition_service.analyze_ingredients(
+                recipe_doc.get("title") or "FridgeScan Recipe",
+                ingredient_lines,
+            )
+        except NutritionCredentialsError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        except httpx.HTTPStatusError as exc:
+            raise HTTPException(
+                status_code=exc.response.status_code,
+                detail=f"Nutrition provider error: {exc.response.text}",
+            ) from exc
+        except Exception as exc:  # pragma: no cover - unexpected
+            raise HTTPException(status_code=500, detail=f"Nutrition analysis failed: {exc}") from exc
+
+        # Upsert so concurrent misses for the same key don't trip the unique index
+        await db.nutrition_cache.update_one(
+            {"key": cache_key},
+            {"$set": {"data": data, "created_at": datetime.now(timezone.utc)}},
+            upsert=True,
         )
-    except NutritionCredentialsError as exc:
-        raise HTTPException(status_code=503, detail=str(exc)) from exc
-    except httpx.HTTPStatusError as exc:
-        raise HTTPException(
-            status_code=exc.response.status_code,
-            detail=f"Nutrition provider error: {exc.response.text}",
-        ) from exc
-    except Exception as exc:  # pragma: no cover - unexpected
-        raise HTTPException(status_code=500, detail=f"Nutrition analysis failed: {exc}") from exc
 
     response = _parse_nutrition_response(data, servings)
     response.recipe_id = str(recipe_id)
@@ -158,7 +188,7 @@ async def calculate_custom_nutrition(
 @router.post("/logs", response_model=schemas.NutritionLog)
 async def log_recipe_nutrition(
     payload: schemas.NutritionLogCreate,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     recipe_service: RecipeService = Depends(get_recipe_service),
     nutrition_service: NutritionService = Depends(get_nutrition_service),
 ):
@@ -171,7 +201,9 @@ async def log_recipe_nutrition(
         nutrition_service=nutrition_service,
     )
 
-    recipe_doc = await db.recipes.find_one({"external_id": str(payload.recipe_id)})
+    recipe_doc = await db.recipes.find_one(
+        {"external_id": str(payload.recipe_id)}, {"title": 1, "_id": 0}
+    )
     recipe_name = recipe_doc.get("title") if recipe_doc else f"Recipe {payload.recipe_id}"
 
     doc = {
@@ -181,26 +213,30 @@ async def log_recipe_nutrition(
         "servings": payload.servings,
         "per_serving": nutrition.per_serving.dict(),
         "total": nutrition.total.dict(),
-        "logged_at": datetime.utcnow(),
+        "logged_at": datetime.now(timezone.utc),
     }
     result = await db.nutrition_logs.insert_one(doc)
     doc["_id"] = result.inserted_id
 
-    return schemas.NutritionLog(
+    return schemas.NutritionLog.model_construct(
         id=str(doc["_id"]),
         recipe_id=doc["recipe_id"],
         recipe_name=doc["recipe_name"],
         servings=doc["servings"],
-        per_serving=schemas.NutritionInfo(**doc["per_serving"]),
-        total=schemas.NutritionInfo(**doc["total"]),
+        per_serving=nutrition.per_serving,
+        total=nutrition.total,
         logged_at=doc["logged_at"],
     )
 
 
-@router.get("/logs", response_model=schemas.NutritionHistory)
+@router.get(
+    "/logs",
+    response_model=schemas.NutritionHistory,
+    response_model_exclude_unset=True,
+)
 async def list_nutrition_logs(
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Return recent nutrition log entries."""
     cursor = (
@@ -208,65 +244,68 @@ async def list_nutrition_logs(
         .sort("logged_at", -1)
         .limit(limit)
     )
-    logs: List[schemas.NutritionLog] = []
-    async for doc in cursor:
-        logs.append(
-            schemas.NutritionLog(
-                id=str(doc["_id"]),
-                recipe_id=doc["recipe_id"],
-                recipe_name=doc["recipe_name"],
-                servings=doc["servings"],
-                per_serving=schemas.NutritionInfo(**doc["per_serving"]),
-                total=schemas.NutritionInfo(**doc["total"]),
-                logged_at=doc["logged_at"],
-            )
+    docs = await cursor.to_list(length=limit)
+    logs = [
+        schemas.NutritionLog.model_construct(
+            id=str(doc["_id"]),
+            recipe_id=doc["recipe_id"],
+            recipe_name=doc["recipe_name"],
+            servings=doc["servings"],
+            per_serving=schemas.NutritionInfo.model_construct(**doc["per_serving"]),
+            total=schemas.NutritionInfo.model_construct(**doc["total"]),
+            logged_at=doc["logged_at"],
         )
+        for doc in docs
+    ]
     return schemas.NutritionHistory(logs=logs)
 
 
 @router.get("/daily-summary", response_model=schemas.DailyNutritionSummary)
 async def daily_nutrition_summary(
     date: str = Query(default=None, description="ISO date (YYYY-MM-DD), defaults to today"),
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Aggregate nutrition totals for a specific day."""
-    if date:
-        try:
-            target_date = datetime.fromisoformat(date).date()
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail="Invalid date format; use YYYY-MM-DD") from exc
-    else:
-        target_date = datetime.utcnow().date()
-
-    start_dt = datetime.combine(target_date, datetime.min.time())
-    end_dt = start_dt + timedelta(days=1)
-
-    cursor = db.nutrition_logs.find(
-        {
-            "user_id": DEFAULT_USER_ID,
-            "logged_at": {"$gte": start_dt, "$lt": end_dt},
-        }
+    # Resolve "today" before the cached helper so it never pins a stale day
+    date_str = date or datetime.now(timezone.utc).date().isoformat()
+    try:
+        start_dt, end_dt, target_date = _day_bounds(date_str)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid date format; use YYYY-MM-DD") from exc
+
+    cursor = await db.nutrition_logs.aggregate(
+        [
+            {
+                "$match": {
+                    "user_id": DEFAULT_USER_ID,
+                    "logged_at": {"$gte": start_dt, "$lt": end_dt},
+                }
+            },
+            {
+                "$group": {
+                    "_id": None,
+                    "calories": {"$sum": "$total.calories"},
+                    "protein": {"$sum": "$total.protein"},
+                    "carbs": {"$sum": "$total.carbs"},
+                    "fats": {"$sum": "$total.fats"},
+                    "fiber": {"$sum": {"$ifNull": ["$total.fiber", 0]}},
+                    "sugar": {"$sum": {"$ifNull": ["$total.sugar", 0]}},
+                    "sodium": {"$sum": {"$ifNull": ["$total.sodium", 0]}},
+                }
+            },
+        ]
     )
-
-    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0, "fiber": 0.0, "sugar": 0.0, "sodium": 0.0}
-    async for doc in cursor:
-        total = doc.get("total", {})
-        totals["calories"] += float(total.get("calories", 0.0))
-        totals["protein"] += float(total.get("protein", 0.0))
-        totals["carbs"] += float(total.get("carbs", 0.0))
-        totals["fats"] += float(total.get("fats", 0.0))
-        totals["fiber"] += float(total.get("fiber") or 0.0)
-        totals["sugar"] += float(total.get("sugar") or 0.0)
-        totals["sodium"] += float(total.get("sodium") or 0.0)
+    groups = await cursor.to_list(length=1)
+    totals = groups[0] if groups else {}
 
     totals_info = schemas.NutritionInfo(
-        calories=round(totals["calories"], 2),
-        protein=round(totals["protein"], 2),
-        carbs=round(totals["carbs"], 2),
-        fats=round(totals["fats"], 2),
-        fiber=round(totals["fiber"], 2),
-        sugar=round(totals["sugar"], 2),
-        sodium=round(totals["sodium"], 2),
+        calories=round(float(totals.get("calories", 0.0)), 2),
+        protein=round(float(totals.get("protein", 0.0)), 2),
+        carbs=round(float(totals.get("carbs", 0.0)), 2),
+        fats=round(float(totals.get("fats", 0.0)), 2),
+        fiber=round(float(totals.get("fiber", 0.0)), 2),
+        sugar=round(float(totals.get("sugar", 0.0)), 2),
+        sodium=round(float(totals.get("sodium", 0.0)), 2),
     )
     return schemas.DailyNutritionSummary(date=target_date, totals=totals_info)
 
@@ -1,12 +1,14 @@
 """Pantry Management API backed by MongoDB."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
 
+from app.core.cache import invalidate_stats
 from app.db import schemas
 from app.db.mongo import get_database
 
@@ -21,7 +23,8 @@ def _serialize_pantry_item(doc: dict) -> schemas.PantryItem:
     if not doc:
         raise ValueError("Document cannot be None")
 
-    return schemas.PantryItem(
+    # Documents come from our own collection, so skip re-validation
+    return schemas.PantryItem.model_construct(
         id=str(doc["_id"]),
         user_id=doc["user_id"],
         name=doc.get("name", ""),
@@ -41,10 +44,16 @@ def _object_id(item_id: str) -> ObjectId:
     return ObjectId(item_id)
 
 
+def _item_filter(item_id: str) -> dict:
+    """Build the owner-scoped filter for a single pantry item."""
+
+    return {"_id": _object_id(item_id), "user_id": DEFAULT_USER_ID}
+
+
 @router.post("/items", response_model=schemas.PantryItem)
 async def create_pantry_item(
     item: schemas.PantryItemCreate,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Add a new item to the pantry."""
 
@@ -52,21 +61,26 @@ async def create_pantry_item(
     document.update(
         {
             "user_id": DEFAULT_USER_ID,
-            "added_date": datetime.utcnow(),
+            "added_date": datetime.now(timezone.utc),
         }
     )
 
     result = await db.pantry_items.insert_one(document)
+    invalidate_stats(DEFAULT_USER_ID)
     document["_id"] = result.inserted_id
     return _serialize_pantry_item(document)
 
 
-@router.get("/items", response_model=List[schemas.PantryItem])
+@router.get(
+    "/items",
+    response_model=List[schemas.PantryItem],
+    response_model_exclude_unset=True,
+)
 async def get_pantry_items(
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Return paginated pantry items for the default user."""
 
@@ -76,22 +90,18 @@ async def get_pantry_items(
 
     cursor = db.pantry_items.find(query).skip(skip).limit(limit)
 
-    items: List[schemas.PantryItem] = []
-    async for doc in cursor:
-        items.append(_serialize_pantry_item(doc))
-
-    return items
+    docs = await cursor.to_list(length=limit or None)
+    return [_serialize_pantry_item(doc) for doc in docs]
 
 
 @router.get("/items/{item_id}", response_model=schemas.PantryItem)
 async def get_pantry_item(
     item_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Fetch a single pantry item by its id."""
 
-    obj_id = _object_id(item_id)
-    doc = await db.pantry_items.find_one({"_id": obj_id, "user_id": DEFAULT_USER_ID})
+    doc = await db.pantry_items.find_one(_item_filter(item_id))
     if not doc:
         raise HTTPException(status_code=404, detail="Item not found")
     return _serialize_pantry_item(doc)
@@ -101,26 +111,25 @@ async def get_pantry_item(
 async def update_pantry_item(
     item_id: str,
     item_update: schemas.PantryItemUpdate,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Update an existing pantry item."""
 
+    item_filter = _item_filter(item_id)
     update_data = item_update.dict(exclude_unset=True)
     if not update_data:
-        return await get_pantry_item(item_id, db)
-
-    obj_id = _object_id(item_id)
-    result = await db.pantry_items.update_one(
-        {"_id": obj_id, "user_id": DEFAULT_USER_ID},
-        {"$set": update_data},
-    )
-
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Item not found")
-
-    doc = await db.pantry_items.find_one({"_id": obj_id, "user_id": DEFAULT_USER_ID})
-    if not doc:
+        doc = await db.pantry_items.find_one(item_filter)
+    else:
+        doc = await db.pantry_items.find_one_and_update(
+            item_filter,
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    if doc is None:
         raise HTTPException(status_code=404, detail="Item not found")
+    if update_data:
+        invalidate_stats(DEFAULT_USER_ID)
 
     return _serialize_pantry_item(doc)
 
@@ -128,27 +137,31 @@ async def update_pantry_item(
 @router.delete("/items/{item_id}")
 async def delete_pantry_item(
     item_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Delete a pantry item."""
 
-    obj_id = _object_id(item_id)
-    result = await db.pantry_items.delete_one({"_id": obj_id, "user_id": DEFAULT_USER_ID})
+    result = await db.pantry_items.delete_one(_item_filter(item_id))
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Item not found")
+    invalidate_stats(DEFAULT_USER_ID)
 
     return {"message": "Item deleted successfully"}
 
 
 @router.get("/categories", response_model=List[str])
 async def get_pantry_categories(
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
 ):
     """Return distinct pantry categories for the default user."""
 
-    categories = await db.pantry_items.distinct(
-        "category", {"user_id": DEFAULT_USER_ID}
+    # With the (user_id, category) index this runs as a DISTINCT_SCAN
+    cursor = await db.pantry_items.aggregate(
+        [
+            {"$match": {"user_id": DEFAULT_USER_ID, "category": {"$nin": [None, ""]}}},
+            {"$group": {"_id": "$category"}},
+        ]
     )
-    return [cat for cat in categories if cat]
+    return [doc["_id"] async for doc in cursor]
 
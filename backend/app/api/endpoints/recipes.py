@@ -2,12 +2,19 @@
 Recipe API Endpoints
 """
 
-from datetime import datetime
-from typing import List
+import asyncio
+from datetime import datetime, timezone
+from typing import FrozenSet, List, Optional
 
+from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi.responses import ORJSONResponse
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from pymongo.asynchronous.database import AsyncDatabase
 
+from app.core.cache import cache_get_json, cache_set_json, invalidate_stats
+from app.core.config import settings
 from app.db import schemas
 from app.db.mongo import get_database
 from app.services.recipe_service import get_recipe_service, RecipeService
@@ -16,8 +23,15 @@ router = APIRouter()
 DEFAULT_USER_ID = "default-user"
 
 
-def _serialize_recipe(doc: dict) -> schemas.Recipe:
-    return schemas.Recipe(
+def _recipe_cache_key(recipe_id: str) -> str:
+    return f"recipe:{recipe_id}"
+
+
+def _serialize_recipe(
+    doc: dict, now: Optional[datetime] = None, is_favorite: bool = False
+) -> schemas.Recipe:
+    # Documents come from our own collection, so skip re-validation
+    return schemas.Recipe.model_construct(
         id=str(doc["_id"]),
         external_id=doc.get("external_id"),
         title=doc.get("title", ""),
@@ -30,16 +44,37 @@ def _serialize_recipe(doc: dict) -> schemas.Recipe:
         ingredients=doc.get("ingredients", []),
         instructions=doc.get("instructions", []),
         nutrition=doc.get("nutrition"),
-        created_at=doc.get("created_at", datetime.utcnow()),
+        created_at=doc.get("created_at") or now or datetime.now(timezone.utc),
         created_by=doc.get("created_by", "system"),
-        is_favorite=doc.get("is_favorite", False),
+        is_favorite=is_favorite,
+    )
+
+
+# Favorites are per user, so the flag is never stored on the shared recipe doc
+# or in its cached payload; upserts also clear the field older docs still carry
+_UNSET_FAVORITE = {"is_favorite": ""}
+
+
+async def _is_favorite(db: AsyncDatabase, recipe_id: str) -> bool:
+    doc = await db.favorite_recipes.find_one(
+        {"user_id": DEFAULT_USER_ID, "recipe_id": recipe_id}, {"_id": 1}
     )
+    return doc is not None
 
 
-@router.get("/suggestions", response_model=List[dict])
+async def _get_favorite_ids(db: AsyncDatabase, recipe_ids: List[str]) -> FrozenSet[str]:
+    """Return which of ``recipe_ids`` the user has favorited (index-only $in match)."""
+    cursor = db.favorite_recipes.find(
+        {"user_id": DEFAULT_USER_ID, "recipe_id": {"$in": recipe_ids}},
+        {"recipe_id": 1, "_id": 0},
+    )
+    return frozenset([doc["recipe_id"] async for doc in cursor if doc.get("recipe_id")])
+
+
+@router.get("/suggestions", response_model=None)
 async def get_recipe_suggestions(
     max_results: int = 10,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     recipe_service: RecipeService = Depends(get_recipe_service)
 ):
     """
@@ -51,42 +86,48 @@ async def get_recipe_suggestions(
     """
     user_id = DEFAULT_USER_ID
 
-    fridge_cursor = db.fridge_items.find(
-        {"user_id": user_id, "freshness_status": {"$ne": "spoiled"}}
-    )
-    pantry_cursor = db.pantry_items.find({"user_id": user_id})
-
-    available_ingredients: List[str] = []
-    async for item in fridge_cursor:
-        name = item.get("name")
-        if name:
-            available_ingredients.append(name)
-
-    async for item in pantry_cursor:
-        name = item.get("name")
-        if name:
-            available_ingredients.append(name)
-
-    # Remove duplicates while preserving order
-    available_ingredients = list(dict.fromkeys(available_ingredients))
+    # Union fridge + pantry names and dedupe them server-side in one pipeline.
+    # Fridge items (src 0) stay ahead of pantry staples (src 1): the recipe
+    # search caps its upstream queries at the first N names.
+    ingredients_pipeline = [
+        {"$match": {"user_id": user_id, "freshness_status": {"$ne": "spoiled"}}},
+        {"$project": {"name": 1, "src": {"$literal": 0}, "_id": 0}},
+        {
+            "$unionWith": {
+                "coll": "pantry_items",
+                "pipeline": [
+                    {"$match": {"user_id": user_id}},
+                    {"$project": {"name": 1, "src": {"$literal": 1}, "_id": 0}},
+                ],
+            }
+        },
+        {"$match": {"name": {"$nin": [None, ""]}}},
+        {"$group": {"_id": "$name", "src": {"$min": "$src"}}},
+        {"$sort": {"src": 1, "_id": 1}},
+    ]
+
+    cursor = await db.fridge_items.aggregate(ingredients_pipeline)
+    ingredient_docs = await cursor.to_list(length=None)
+
+    available_ingredients: List[str] = [doc["_id"] for doc in ingredient_docs]
 
     if not available_ingredients:
-        return []
-    
-    favorite_docs = await db.favorite_recipes.find({"user_id": DEFAULT_USER_ID}).to_list(length=None)
-    favorite_ids = {doc.get("recipe_id") for doc in favorite_docs}
+        return ORJSONResponse([])
     
     recipes = await recipe_service.search_by_ingredients(
         ingredients=available_ingredients,
         number=max_results
     )
     
+    # Only the returned recipes need a favorite flag: match them server-side
+    # while the summary upserts are in flight instead of loading every favorite.
+    external_ids = [str(recipe.get("id")) for recipe in recipes]
+    now = datetime.now(timezone.utc)
     results = []
-    for recipe in recipes:
-        # Get parsed meal data for servings and cooking_time
-        parsed = recipe_service._parse_meal(recipe.get("meal", {})) if hasattr(recipe_service, '_parse_meal') else {}
+    upserts = []
+    for recipe, external_id in zip(recipes, external_ids):
         summary_doc = {
-            "external_id": str(recipe.get("id")),
+            "external_id": external_id,
             "title": recipe.get("title"),
             "description": None,
             "image_url": recipe.get("image"),
@@ -98,18 +139,19 @@ async def get_recipe_suggestions(
             "instructions": recipe.get("instructions", []),
             "nutrition": None,
             "created_by": "themealdb",
-            "updated_at": datetime.utcnow(),
+            "updated_at": now,
         }
 
-        summary_doc["is_favorite"] = summary_doc["external_id"] in favorite_ids
-
-        await db.recipes.update_one(
-            {"external_id": summary_doc["external_id"]},
-            {
-                "$set": summary_doc,
-                "$setOnInsert": {"created_at": datetime.utcnow()},
-            },
-            upsert=True,
+        upserts.append(
+            UpdateOne(
+                {"external_id": summary_doc["external_id"]},
+                {
+                    "$set": summary_doc,
+                    "$setOnInsert": {"created_at": now},
+                    "$unset": _UNSET_FAVORITE,
+                },
+                upsert=True,
+            )
         )
 
         results.append({
@@ -119,82 +161,119 @@ async def get_recipe_suggestions(
             "match_percentage": recipe.get("match_percentage", 0),
             "used_ingredients": recipe.get("used_ingredients", []),
             "missing_ingredients": recipe.get("missed_ingredients", []),
-            "is_favorite": summary_doc["external_id"] in favorite_ids,
+            "is_favorite": False,
             "servings": recipe.get("servings"),
             "cooking_time": recipe.get("cooking_time"),
         })
-    
-    return results
+
+    if not upserts:
+        return ORJSONResponse(results)
+
+    # One round-trip for all recipe upserts, overlapped with the favorites match
+    _, favorite_ids = await asyncio.gather(
+        db.recipes.bulk_write(upserts, ordered=False),
+        _get_favorite_ids(db, external_ids),
+    )
+    if favorite_ids:
+        for result, external_id in zip(results, external_ids):
+            result["is_favorite"] = external_id in favorite_ids
+
+    # Plain JSON-native dicts: hand them to orjson directly, skipping
+    # FastAPI's jsonable_encoder pass over every nested ingredient list
+    return ORJSONResponse(results)
 
 
 @router.get("/{recipe_id}", response_model=schemas.Recipe)
 async def get_recipe_details(
     recipe_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     recipe_service: RecipeService = Depends(get_recipe_service)
 ):
     """Get detailed information about a specific recipe"""
+    cache_key = _recipe_cache_key(recipe_id)
+    cached, is_favorite = await asyncio.gather(
+        cache_get_json(cache_key), _is_favorite(db, recipe_id)
+    )
+    if cached is not None:
+        return schemas.Recipe.model_validate({**cached, "is_favorite": is_favorite})
+
     # Look for cached recipe
     doc = await db.recipes.find_one({"external_id": str(recipe_id)})
     if doc:
-        return _serialize_recipe(doc)
+        recipe = _serialize_recipe(doc, is_favorite=is_favorite)
+        await cache_set_json(
+            cache_key,
+            recipe.model_dump(mode="json", exclude={"is_favorite"}),
+            settings.RECIPE_CACHE_TTL_SECONDS,
+        )
+        return recipe
 
     recipe = await recipe_service.get_recipe_details(recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-        # Cache the recipe for future requests
-        document = {
-            "external_id": str(recipe_id),
-            "title": recipe.get("title"),
-            "description": None,
-            "image_url": recipe.get("image"),
-            "cuisines": recipe.get("cuisines"),
-            "meal_types": recipe.get("meal_types"),
-            "cooking_time": recipe.get("cooking_time"),
-            "servings": recipe.get("servings"),
-            "ingredients": recipe.get("extendedIngredients", []),
-            "instructions": (recipe.get("instructions") or "").split("\n"),
-            "nutrition": recipe.get("nutrition"),
-            "created_at": datetime.utcnow(),
-            "created_by": "themealdb",
-        }
-    result = await db.recipes.insert_one(document)
-    document["_id"] = result.inserted_id
-    return _serialize_recipe(document)
+    # Store the fetched recipe so later requests are served from Mongo
+    now = datetime.now(timezone.utc)
+    document_fields = {
+        "external_id": str(recipe_id),
+        "title": recipe.get("title"),
+        "description": None,
+        "image_url": recipe.get("image"),
+        "cuisines": recipe.get("cuisines"),
+        "meal_types": recipe.get("meal_types"),
+        "cooking_time": recipe.get("cooking_time"),
+        "servings": recipe.get("servings"),
+        "ingredients": recipe.get("extendedIngredients", []),
+        "instructions": (recipe.get("instructions") or "").split("\n"),
+        "nutrition": recipe.get("nutrition"),
+        "created_by": "themealdb",
+        "updated_at": now,
+    }
+    doc = await db.recipes.find_one_and_update(
+        {"external_id": document_fields["external_id"]},
+        {
+            "$set": document_fields,
+            "$setOnInsert": {"created_at": now},
+            "$unset": _UNSET_FAVORITE,
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    recipe_model = _serialize_recipe(doc, now, is_favorite)
+    await cache_set_json(
+        cache_key,
+        recipe_model.model_dump(mode="json", exclude={"is_favorite"}),
+        settings.RECIPE_CACHE_TTL_SECONDS,
+    )
+    return recipe_model
 
 
 @router.post("/favorites", response_model=schemas.FavoriteRecipe)
 async def add_favorite_recipe(
     favorite: schemas.FavoriteRecipeCreate,
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    db: AsyncDatabase = Depends(get_database)
 ):
     """Save a recipe as favorite"""
-    existing = await db.favorite_recipes.find_one({
-        "user_id": DEFAULT_USER_ID,
-        "recipe_id": favorite.recipe_id
-    })
-
-    if existing:
-        return schemas.FavoriteRecipe(
-            id=str(existing["_id"]),
-            user_id=existing["user_id"],
-            recipe_id=existing["recipe_id"],
-            created_at=existing.get("created_at", datetime.utcnow())
-        )
+    now = datetime.now(timezone.utc)
+    key = {"user_id": DEFAULT_USER_ID, "recipe_id": favorite.recipe_id}
+    doc = await db.favorite_recipes.find_one(key)
+
+    if not doc:
+        doc = {**key, "created_at": now}
+        try:
+            result = await db.favorite_recipes.insert_one(doc)
+        except DuplicateKeyError:
+            # A concurrent add won the unique (user_id, recipe_id) index
+            doc = await db.favorite_recipes.find_one(key)
+        else:
+            doc["_id"] = result.inserted_id
+            invalidate_stats(DEFAULT_USER_ID)
 
-    doc = {
-        "user_id": DEFAULT_USER_ID,
-        "recipe_id": favorite.recipe_id,
-        "created_at": datetime.utcnow()
-    }
-    result = await db.favorite_recipes.insert_one(doc)
-    doc["_id"] = result.inserted_id
     return schemas.FavoriteRecipe(
         id=str(doc["_id"]),
         user_id=doc["user_id"],
         recipe_id=doc["recipe_id"],
-        created_at=doc["created_at"]
+        created_at=doc.get("created_at") or now
     )
 
 
@@ -202,10 +281,22 @@ async def add_favorite_recipe(
 async def get_favorite_recipes(
     skip: int = 0,
     limit: int = 50,
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    before: Optional[str] = None,
+    db: AsyncDatabase = Depends(get_database)
 ):
-    """Get all favorite recipes for the current user"""
-    cursor = db.favorite_recipes.find({"user_id": DEFAULT_USER_ID}).skip(skip).limit(limit)
+    """
+    Get favorite recipes for the current user, newest first
+
+    - Pass the last returned id as `before` to fetch the next page
+    - `skip` still works but costs O(skip) on the server
+    """
+    query: dict = {"user_id": DEFAULT_USER_ID}
+    if before:
+        if not ObjectId.is_valid(before):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["_id"] = {"$lt": ObjectId(before)}
+    cursor = db.favorite_recipes.find(query).sort("_id", -1).skip(skip).limit(limit)
+    now = datetime.now(timezone.utc)
     favorites: List[schemas.FavoriteRecipe] = []
     async for doc in cursor:
         favorites.append(
@@ -213,7 +304,7 @@ async def get_favorite_recipes(
                 id=str(doc["_id"]),
                 user_id=doc["user_id"],
                 recipe_id=doc["recipe_id"],
-                created_at=doc.get("created_at", datetime.utcnow())
+                created_at=doc.get("created_at") or now
             )
         )
     return favorites
@@ -222,7 +313,7 @@ async def get_favorite_recipes(
 @router.delete("/favorites/{recipe_id}")
 async def remove_favorite_recipe(
     recipe_id: str,
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    db: AsyncDatabase = Depends(get_database)
 ):
     """Remove a recipe from favorites"""
     result = await db.favorite_recipes.delete_one({
@@ -232,6 +323,7 @@ async def remove_favorite_recipe(
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Favorite not found")
+    invalidate_stats(DEFAULT_USER_ID)
     return {"message": "Removed from favorites"}
 
 
@@ -239,12 +331,13 @@ async def remove_favorite_recipe(
 async def search_recipes_by_name(
     query: str,
     number: int = 10,
-    db: AsyncIOMotorDatabase = Depends(get_database),
+    db: AsyncDatabase = Depends(get_database),
     recipe_service: RecipeService = Depends(get_recipe_service),
 ):
     """Search recipes by name or keywords."""
     results = await recipe_service.search_by_name(query=query, number=number)
-    serialized: List[schemas.Recipe] = []
+    now = datetime.now(timezone.utc)
+    upserts = []
     for recipe in results:
         summary_doc = {
             "external_id": str(recipe.get("id")),
@@ -259,23 +352,33 @@ async def search_recipes_by_name(
             "instructions": recipe.get("instructions", []),
             "nutrition": None,
             "created_by": "themealdb",
-            "updated_at": datetime.utcnow(),
+            "updated_at": now,
         }
 
-        await db.recipes.update_one(
-            {"external_id": summary_doc["external_id"]},
-            {
-                "$set": summary_doc,
-                "$setOnInsert": {"created_at": datetime.utcnow()},
-            },
-            upsert=True,
+        # Upsert and read back in one round-trip; the response needs the stored _id
+        upserts.append(
+            db.recipes.find_one_and_update(
+                {"external_id": summary_doc["external_id"]},
+                {
+                    "$set": summary_doc,
+                    "$setOnInsert": {"created_at": now},
+                    "$unset": _UNSET_FAVORITE,
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
         )
 
-        doc = await db.recipes.find_one({"external_id": summary_doc["external_id"]})
-        if doc:
-            serialized.append(_serialize_recipe(doc))
-
-    return serialized
+    # Resolve the per-user favorite flag alongside the upserts
+    favorite_ids, *docs = await asyncio.gather(
+        _get_favorite_ids(db, [str(recipe.get("id")) for recipe in results]),
+        *upserts,
+    )
+    return [
+        _serialize_recipe(doc, now, doc.get("external_id") in favorite_ids)
+        for doc in docs
+        if doc
+    ]
 
 
 
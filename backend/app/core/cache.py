@@ -0,0 +1,145 @@
+"""Caches shared between endpoint and service modules.
+
+Kept separate from the routers so write endpoints can invalidate cached reads
+without importing each other. Dashboard stats live in-process; recipe details
+and Edamam analyses go through Redis when ``REDIS_URL`` is configured.
+"""
+
+import asyncio
+from functools import lru_cache
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.db import schemas
+
+try:  # Optional dependency for the shared cache
+    import redis.asyncio as redis  # type: ignore
+except Exception:  # pragma: no cover - package not installed
+    redis = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+
+# user_id -> (monotonic timestamp, stats)
+_STATS_CACHE: Dict[str, Tuple[float, schemas.DashboardStats]] = {}
+# user_id -> counter bumped on every invalidation
+_STATS_GENERATION: Dict[str, int] = {}
+# user_id -> computation shared by concurrent requests
+_STATS_INFLIGHT: Dict[str, "asyncio.Task[schemas.DashboardStats]"] = {}
+
+
+def get_cached_stats(user_id: str) -> Optional[schemas.DashboardStats]:
+    """Return cached dashboard stats for a user if they are still fresh."""
+
+    entry = _STATS_CACHE.get(user_id)
+    if entry and time.monotonic() - entry[0] < settings.CACHE_TTL_SECONDS:
+        return entry[1]
+    return None
+
+
+def store_stats(user_id: str, stats: schemas.DashboardStats) -> None:
+    """Remember freshly computed dashboard stats for a user."""
+
+    _STATS_CACHE[user_id] = (time.monotonic(), stats)
+
+
+def invalidate_stats(user_id: str) -> None:
+    """Drop cached dashboard stats after a write that changes the counters."""
+
+    _STATS_CACHE.pop(user_id, None)
+    _STATS_GENERATION[user_id] = _STATS_GENERATION.get(user_id, 0) + 1
+    # Later requests must not join a computation that may predate the write
+    _STATS_INFLIGHT.pop(user_id, None)
+
+
+async def get_or_compute_stats(
+    user_id: str, compute: Callable[[], Awaitable[schemas.DashboardStats]]
+) -> schemas.DashboardStats:
+    """Return cached stats, or compute them once for all concurrent callers.
+
+    Nothing is held across the computation, so users never wait on each other.
+    The result is cached only if no invalidation happened while it ran.
+    """
+
+    cached = get_cached_stats(user_id)
+    if cached is not None:
+        return cached
+
+    task = _STATS_INFLIGHT.get(user_id)
+    if task is None:
+        task = asyncio.ensure_future(_compute_stats(user_id, compute))
+        _STATS_INFLIGHT[user_id] = task
+        task.add_done_callback(lambda done: _forget_stats_task(user_id, done))
+    # Shield so one caller going away does not cancel the computation for the rest
+    return await asyncio.shield(task)
+
+
+async def _compute_stats(
+    user_id: str, compute: Callable[[], Awaitable[schemas.DashboardStats]]
+) -> schemas.DashboardStats:
+    generation = _STATS_GENERATION.get(user_id, 0)
+    stats = await compute()
+    if _STATS_GENERATION.get(user_id, 0) == generation:
+        store_stats(user_id, stats)
+    return stats
+
+
+def _forget_stats_task(user_id: str, task: "asyncio.Task[Any]") -> None:
+    if _STATS_INFLIGHT.get(user_id) is task:
+        del _STATS_INFLIGHT[user_id]
+
+
+# ----------------------------------------------------------------------
+# Redis read-through cache (no-op when Redis is not configured)
+# ----------------------------------------------------------------------
+@lru_cache
+def _get_redis():
+    """Return a cached Redis client, or None if Redis is unavailable."""
+
+    if redis is None or not settings.REDIS_URL:
+        return None
+    return redis.from_url(settings.REDIS_URL)
+
+
+async def cache_get_json(key: str) -> Optional[Any]:
+    """Fetch and decode a JSON value; cache errors are treated as misses."""
+
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+    except Exception as exc:
+        LOGGER.warning("Redis get failed for %s: %s", key, exc)
+        return None
+    if raw is None:
+        return None
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        LOGGER.debug("Ignoring undecodable cache value for %s", key)
+        return None
+
+
+async def cache_set_json(key: str, value: Any, ttl_seconds: int) -> None:
+    """Store a JSON-serializable value with an expiry."""
+
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, orjson.dumps(value), ex=ttl_seconds)
+    except Exception as exc:
+        LOGGER.warning("Redis set failed for %s: %s", key, exc)
+
+
+async def close_cache() -> None:
+    """Close the Redis connection pool on shutdown."""
+
+    client = _get_redis()
+    if client is not None:
+        await client.aclose()
@@ -1,13 +1,21 @@
-from pydantic_settings import BaseSettings
+import atexit
+from functools import lru_cache
+import logging
+import logging.handlers
+import queue
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
+
     # Legacy SQL support (kept optional while migrating to MongoDB)
     DATABASE_URL: Optional[str] = None
     # MongoDB
     MONGODB_URI: str
     MONGODB_DB: str
+    MONGODB_COMPRESSORS: str = "zstd,snappy,zlib"  # Wire compression, in preference order
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production-09876543210"
@@ -23,14 +31,41 @@ class Settings(BaseSettings):
     
     # External APIs - MealDB (no key required)
     THEMEALDB_BASE_URL: str = "https://www.themealdb.com/api/json/v1/1"
+    THEMEALDB_MAX_CONCURRENCY: int = 8  # In-flight TheMealDB requests per worker
+    THEMEALDB_MAX_FILTER_TERMS: int = 24  # filter.php calls per ingredient search
+    THEMEALDB_FILTER_CACHE_TTL_SECONDS: int = 3600  # filter.php results per ingredient/category
+    THEMEALDB_LOOKUP_CACHE_TTL_SECONDS: int = 86400  # lookup.php meals per id
+    THEMEALDB_SEARCH_CACHE_TTL_SECONDS: int = 600  # search.php results per query
     
     # Computer Vision - Model Configuration
     CV_MODEL_PATH: str = "../computer_vision/models/yolov8n.pt"
     CV_CLASSIFIER_PATH: str = "../computer_vision/models/classifier_traced.pt"
     # Multi-model support
     CV_USE_ENSEMBLE: bool = False  # Set to True to use both primary and secondary models together
+    CV_ENSEMBLE_IOU: float = 0.5  # Same-label boxes overlapping more than this are merged across models
     CV_PRIMARY_MODEL: str = "best.pt"  # Primary model filename
     CV_SECONDARY_MODEL: Optional[str] = None  # Secondary model filename (auto-detected if None)
+    CV_USE_TENSORRT: bool = False  # Export weights to a TensorRT .engine once and load that instead
+    CV_TENSORRT_HALF: bool = True  # FP16 engine (ignored on GPUs without fast FP16)
+    CV_TENSORRT_INT8: bool = False  # INT8 engine calibrated on the data.yaml dataset (overrides HALF)
+    CV_INT8_DRIFT_SAMPLES: int = 16  # Validation images compared against the .pt model after INT8 export
+    CV_IMAGE_SIZE: int = 640  # Inference/export image size
+    CV_CUDA_AUTOCAST: bool = True  # channels_last + fp16 autocast for PyTorch weights on CUDA
+    CV_WARMUP: bool = True  # Run one dummy inference per model at startup
+    CV_MAX_BATCH: int = 8  # Max concurrent scans coalesced into one model call
+    CV_BATCH_WINDOW_MS: float = 5.0  # How long the batcher waits for more scans to join a batch
+    CV_RESULT_CACHE_SIZE: int = 32  # Recent images whose raw per-model detections are memoized
+    CV_MMAP_WEIGHTS: bool = False  # Memory-map .pt checkpoints on load (avoid on network filesystems)
+    CV_ENABLE_SERIALIZED_CACHE: bool = False  # Pickle loaded models next to the weights (trusted local files only)
+    MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024  # Reject scan uploads larger than this
+    
+    # Caching
+    CACHE_TTL_SECONDS: int = 10  # Dashboard stats cache lifetime
+    NUTRITION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # Cached Edamam responses
+    NUTRITION_MEMORY_CACHE_SIZE: int = 2048  # In-process Edamam responses kept per worker
+    NUTRITION_MEMORY_CACHE_TTL_SECONDS: int = 3600
+    REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/0; caching is skipped if unset
+    RECIPE_CACHE_TTL_SECONDS: int = 600
     
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
@@ -38,15 +73,42 @@ class Settings(BaseSettings):
     # API Settings
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Smart Fridge Recipe App"
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    LOG_LEVEL: str = "INFO"
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Load settings from the environment once per process."""
+    return Settings()
+
+
+settings = get_settings()
+
 
+_log_listener: Optional[logging.handlers.QueueListener] = None
 
-settings = Settings()
 
+def configure_logging() -> None:
+    """Route root logging through a queue drained on a background thread.
 
+    Log calls from the event loop then only enqueue the record; formatting and
+    the stderr write (and its lock) happen on the listener thread.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
 
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    if not handlers:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        handlers = [stream]
 
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL)
 
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
@@ -1,26 +1,32 @@
 """Legacy SQLAlchemy helpers (kept for backwards compatibility).
 
 These functions are no-ops now that the project is moving to MongoDB, but they
-remain to avoid import errors while endpoints are migrated.
+remain to avoid import errors while endpoints are migrated. SQLAlchemy is only
+imported, and the engine only built, the first time something asks for it.
 """
 
 from contextlib import contextmanager
-from typing import Generator
+from functools import lru_cache
+from typing import Any, Generator, Optional, Tuple
 
 from app.core.config import settings
 
 
-try:
-    from sqlalchemy import create_engine
-    from sqlalchemy.ext.declarative import declarative_base
-    from sqlalchemy.orm import sessionmaker
-except ImportError:  # pragma: no cover - SQLAlchemy might be absent
-    create_engine = None  # type: ignore
-    declarative_base = None  # type: ignore
-    sessionmaker = None  # type: ignore
+@lru_cache
+def _sql_engine() -> Tuple[Optional[Any], Optional[Any], Optional[Any]]:
+    """Return ``(engine, SessionLocal, Base)``, building them on first use."""
 
+    try:
+        from sqlalchemy import create_engine
+        from sqlalchemy.ext.declarative import declarative_base
+        from sqlalchemy.orm import sessionmaker
+    except ImportError:  # pragma: no cover - SQLAlchemy might be absent
+        return None, None, None
+
+    Base = declarative_base()
+    if not settings.DATABASE_URL:
+        return None, None, Base
 
-if settings.DATABASE_URL and create_engine and sessionmaker:
     engine = create_engine(
         settings.DATABASE_URL,
         connect_args={"check_same_thread": False}
@@ -28,17 +34,23 @@ if settings.DATABASE_URL and create_engine and sessionmaker:
         else {},
     )
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    Base = declarative_base()
-else:
-    engine = None
-    SessionLocal = None
-    Base = declarative_base() if declarative_base else None
+    return engine, SessionLocal, Base
+
+
+def __getattr__(name: str) -> Any:
+    """Keep ``from app.db.database import Base`` (and friends) working lazily."""
+
+    names = ("engine", "SessionLocal", "Base")
+    if name in names:
+        return _sql_engine()[names.index(name)]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @contextmanager
 def get_db() -> Generator:
     """Yield a SQLAlchemy session if configured, otherwise raise informative error."""
 
+    _, SessionLocal, _ = _sql_engine()
     if SessionLocal is None:
         raise RuntimeError(
             "SQLAlchemy database session not configured. "
@@ -54,13 +66,9 @@ def get_db() -> Generator:
 def init_db() -> None:
     """Initialize SQL tables if SQLAlchemy is still enabled."""
 
+    engine, _, Base = _sql_engine()
     if Base is None or engine is None:
         print("SQL database initialization skipped (using MongoDB).")
         return
     Base.metadata.create_all(bind=engine)
     print("Database tables created successfully!")
-
-
-
-
-
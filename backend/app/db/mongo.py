@@ -1,20 +1,37 @@
-"""MongoDB client helpers using Motor.
+"""MongoDB client helpers using PyMongo's native asyncio driver.
 
-This module centralizes creation of the AsyncIOMotorClient instance so that the
+This module centralizes creation of the AsyncMongoClient instance so that the
 FastAPI dependency system can reuse the same client across requests.
 """
 
+import asyncio
 from functools import lru_cache
-from motor.motor_asyncio import AsyncIOMotorClient
+import logging
+from typing import Any
+
+from pymongo import AsyncMongoClient
+from pymongo.errors import PyMongoError
 
 from app.core.config import settings
 
+LOGGER = logging.getLogger(__name__)
+
 
 @lru_cache
-def _get_client() -> AsyncIOMotorClient:
-    """Return a cached Motor client built from settings."""
+def _get_client() -> AsyncMongoClient:
+    """Return a cached async client built from settings.
+
+    ``tz_aware`` makes stored datetimes come back as UTC-aware values, matching
+    the ``datetime.now(timezone.utc)`` timestamps the endpoints write.
+    Wire compression is negotiated with the server; compressors whose
+    Python packages are missing are skipped.
+    """
 
-    return AsyncIOMotorClient(settings.MONGODB_URI)
+    return AsyncMongoClient(
+        settings.MONGODB_URI,
+        tz_aware=True,
+        compressors=settings.MONGODB_COMPRESSORS,
+    )
 
 
 def get_database():
@@ -31,4 +48,43 @@ def get_collection(name: str):
     return db[name]
 
 
+async def ensure_indexes() -> None:
+    """Create the indexes backing the hot API queries (no-op if they exist).
+
+    Failures are logged per index rather than raised: an existing database
+    with duplicate keys, or a briefly unreachable server, must not stop the
+    API from booting. The queries still work without the index.
+    """
+
+    db = get_database()
+    await asyncio.gather(
+        _create_index(db.fridge_items, [("user_id", 1), ("detected_date", -1)]),
+        _create_index(db.fridge_items, [("user_id", 1), ("freshness_status", 1)]),
+        _create_index(db.pantry_items, [("user_id", 1), ("expiry_date", 1)]),
+        _create_index(db.pantry_items, [("user_id", 1), ("category", 1)]),
+        _create_index(db.nutrition_logs, [("user_id", 1), ("logged_at", -1)]),
+        _create_index(db.favorite_recipes, [("user_id", 1), ("recipe_id", 1)], unique=True),
+        _create_index(db.favorite_recipes, [("user_id", 1), ("_id", -1)]),
+        _create_index(db.recipes, [("external_id", 1)], unique=True),
+        _create_index(db.nutrition_cache, "key", unique=True),
+        _create_index(
+            db.nutrition_cache,
+            "created_at",
+            expireAfterSeconds=settings.NUTRITION_CACHE_TTL_SECONDS,
+        ),
+    )
+
+
+async def _create_index(collection: Any, keys: Any, **kwargs: Any) -> None:
+    try:
+        await collection.create_index(keys, **kwargs)
+    except PyMongoError as exc:
+        LOGGER.warning("Could not create index %s on %s: %s", keys, collection.name, exc)
+
+
+async def close_client() -> None:
+    """Close the shared client if one was created."""
 
+    if _get_client.cache_info().currsize:
+        await _get_client().close()
+        _get_client.cache_clear()
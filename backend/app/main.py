@@ -4,14 +4,20 @@ Smart Fridge Recipe App - Main FastAPI Application
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import settings
+from fastapi.responses import ORJSONResponse
+from app.core.cache import close_cache
+from app.core.config import configure_logging, settings
+from app.db.mongo import close_client, ensure_indexes
+from app.services.nutrition_service import nutrition_service
+from app.services.recipe_service import create_http_client, recipe_service
 from app.api.endpoints import fridge, pantry, recipes, nutrition, dashboard
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version="1.0.0",
-    description="Smart Fridge Recipe App - AI-powered food management and recipe suggestions"
+    description="Smart Fridge Recipe App - AI-powered food management and recipe suggestions",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -32,13 +38,29 @@ app.include_router(dashboard.router, prefix=f"{settings.API_V1_STR}/dashboard",
 
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     """Initialize database on startup"""
+    configure_logging()
+    # Bind shared clients first so shutdown can always release them
+    app.state.http = create_http_client()
+    recipe_service.http = app.state.http
+    await ensure_indexes()
     print("Starting Smart Fridge Recipe App...")
     print("API documentation: http://localhost:8000/docs")
     print("Backend running on: http://localhost:8000")
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Release shared connections"""
+    await close_cache()
+    http = getattr(app.state, "http", None)
+    if http is not None:
+        await http.aclose()
+    await nutrition_service.aclose()
+    await close_client()
+
+
 @app.get("/")
 def root():
     """Root endpoint - API health check"""
@@ -57,8 +79,21 @@ def health_check():
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+
+    # uvloop + httptools ship with uvicorn[standard]. Set WEB_CONCURRENCY above 1
+    # to run one worker per core instead of the auto-reloading dev server.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        reload=workers == 1,
+        workers=workers,
+    )
 
 
 
@@ -6,15 +6,28 @@ This implementation attempts to load a YOLO model (Ultralytics) from
 available, the service raises a `DetectionModelNotReady` error so the
 API layer can respond gracefully instead of crashing. Mock helpers are
 retained for local development.
+
+Async callers should use ``detect_ingredients_both_models_async``: image
+decode runs in a worker thread so the event loop keeps serving other
+requests, and model calls are batched across concurrent scans. Decode uses OpenCV when present;
+on the PIL fallback, Pillow-SIMD (a drop-in ``pillow`` replacement with AVX2
+JPEG paths) speeds it up considerably.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import io
 import logging
 import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import yaml
 from PIL import Image
@@ -26,13 +39,302 @@ try:  # Optional dependency for the real detector
 except Exception:  # pragma: no cover - package not installed
     YOLO = None  # type: ignore
 
+try:  # Optional memo of recent per-image detections
+    from cachetools import LRUCache
+except Exception:  # pragma: no cover - package not installed
+    LRUCache = None  # type: ignore
+
+try:  # OpenCV + NumPy ship with ultralytics; PIL is the fallback decoder
+    import cv2  # type: ignore
+    import numpy as np
+except Exception:  # pragma: no cover - package not installed
+    cv2 = None  # type: ignore
+    np = None  # type: ignore
+
+try:  # torchvision ships with ultralytics; used for cross-model NMS in ensemble mode
+    import torch
+    from torchvision.ops import batched_nms
+except Exception:  # pragma: no cover - package not installed
+    torch = None  # type: ignore
+    batched_nms = None  # type: ignore
+
+if torch is not None:
+    # Input shapes are fixed (CV_IMAGE_SIZE, batch <= CV_MAX_BATCH), so autotuning pays off
+    torch.backends.cudnn.benchmark = True
+
+try:  # POSIX-only; used to serialize one-off engine exports across workers
+    import fcntl
+except Exception:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+
 LOGGER = logging.getLogger(__name__)
 
 
+# Known labels per category (from data.yaml), in match-priority order
+_CATEGORY_LABELS: Dict[str, Tuple[str, ...]] = {
+    "fruits": ("apple", "banana", "blue berry", "stawberry", "strawberry", "lemon", "orange"),
+    "vegetables": (
+        "brinjal", "cabbage", "capsicum", "carrot", "corn", "cucumber",
+        "ginger", "green beans", "green chilly", "green leaves", "lettuce",
+        "mushroom", "potato", "sweet potato", "tomato", "spinach", "broccoli",
+    ),
+    "dairy": ("milk", "cheese", "butter", "fresh cream", "yogurt", "egg"),
+    "meat": ("chicken", "meat", "shrimp"),
+    "grains": ("bread", "flour"),
+    "other": ("chocolate",),
+}
+
+# Looser keywords tried only when no known label appears in the text
+_FALLBACK_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "fruits": ("fruit", "berry"),
+    "vegetables": ("veg", "leaf"),
+    "dairy": ("milk", "cream", "cheese"),
+    "meat": ("chicken", "meat", "fish", "shrimp"),
+    "grains": ("bread", "flour", "grain"),
+}
+
+
+def _keyword_pattern(words: Tuple[str, ...]) -> "re.Pattern[str]":
+    # Longest first so the alternation never stops on a shorter prefix
+    return re.compile("|".join(map(re.escape, sorted(words, key=len, reverse=True))))
+
+
+_EXACT_CATEGORY: Dict[str, str] = {}
+for _category, _labels in _CATEGORY_LABELS.items():
+    for _label in _labels:
+        _EXACT_CATEGORY.setdefault(_label, _category)
+
+_PARTIAL_PATTERNS = tuple(
+    (category, _keyword_pattern(labels))
+    for category, labels in _CATEGORY_LABELS.items()
+    if category != "other"
+)
+_FALLBACK_PATTERNS = tuple(
+    (category, _keyword_pattern(words)) for category, words in _FALLBACK_KEYWORDS.items()
+)
+
+# Decoded image as handed to the models: a BGR ndarray from OpenCV, or a PIL image
+ImageInput = Union["np.ndarray", Image.Image]
+# Per-model (labels, categories) arrays indexed by class id
+LabelLookup = Tuple["np.ndarray", "np.ndarray"]
+
+
+class PreparedImage(NamedTuple):
+    """An image letterboxed once into model input format, shareable across models."""
+
+    tensor: Any  # (1, 3, S, S) float32 RGB in [0, 1]
+    ratio: float  # resize factor applied to the original image
+    pad: Tuple[float, float]  # (left, top) padding in model pixels
+    shape: Tuple[int, int]  # original (height, width)
+
+
+# Anything the detectors accept
+ModelInput = Union[ImageInput, PreparedImage]
+
+
 class DetectionModelNotReady(RuntimeError):
     """Raised when the detection model cannot be loaded or used."""
 
 
+def _decode_image(image_bytes: bytes) -> ImageInput:
+    """Decode an upload straight into the array layout Ultralytics consumes.
+
+    OpenCV decodes into a single BGR ndarray, which Ultralytics takes as-is
+    (no RGB conversion or PIL -> ndarray copy on its side).
+    """
+    if cv2 is not None:
+        image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("unsupported or corrupt image data")
+        return image
+    return Image.open(io.BytesIO(image_bytes)).convert("RGB")
+
+
+class ModelCache:
+    """Process-wide cache so every service instance shares one model per weights file.
+
+    Keyed on ``(path, device)``; the loader only runs on a miss.
+    """
+
+    def __init__(self) -> None:
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, device: str, loader: Callable[[], Any]) -> Any:
+        key = (str(path), device)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = loader()
+                self._models[key] = model
+            return model
+
+    def clear_device(self, device: Optional[str] = None) -> None:
+        """Drop cached models for ``device`` (or all of them), e.g. on hot reload."""
+        with self._lock:
+            if device is None:
+                self._models.clear()
+            else:
+                for key in [key for key in self._models if key[1] == device]:
+                    del self._models[key]
+
+
+_MODEL_CACHE = ModelCache()
+
+
+def _inference_device() -> str:
+    return "cuda" if torch is not None and torch.cuda.is_available() else "cpu"
+
+
+def _letterbox(image: "np.ndarray", size: int) -> PreparedImage:
+    """Resize/pad a BGR image to ``size``x``size`` the way Ultralytics does, once."""
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_w, new_h = round(width * ratio), round(height * ratio)
+    pad_w, pad_h = (size - new_w) / 2, (size - new_h) / 2
+    top, left = round(pad_h - 0.1), round(pad_w - 0.1)
+    bottom, right = round(pad_h + 0.1), round(pad_w + 0.1)
+
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    image = cv2.copyMakeBorder(
+        image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114)
+    )
+    # BGR HWC uint8 -> RGB CHW float in [0, 1]
+    chw = np.ascontiguousarray(image[..., ::-1].transpose(2, 0, 1))
+    tensor = torch.from_numpy(chw).unsqueeze(0).float().div_(255.0)
+    return PreparedImage(tensor, ratio, (left, top), (height, width))
+
+
+def _unletterbox(xyxy: "np.ndarray", prepared: PreparedImage) -> "np.ndarray":
+    """Map boxes from letterboxed model space back to original image pixels."""
+    left, top = prepared.pad
+    height, width = prepared.shape
+    boxes = xyxy.copy()
+    boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - left) / prepared.ratio).clip(0, width)
+    boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - top) / prepared.ratio).clip(0, height)
+    return boxes
+
+
+class _DetectionBatcher:
+    """Coalesces concurrent single-image requests for one model into batched calls.
+
+    The first queued request opens a short window; everything that arrives
+    within it (up to ``max_batch``) goes to the model in a single forward pass,
+    and each caller's future receives its own slice of the results.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[ModelInput]], List[List[Dict[str, Any]]]],
+        max_batch: int,
+        window_seconds: float,
+    ) -> None:
+        self._run_batch = run_batch
+        self._max_batch = max(1, max_batch)
+        self._window = window_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, image: ModelInput) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        await self._queue.put((image, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._window
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await asyncio.to_thread(self._run_batch, [image for image, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            for (_, future), detections in zip(batch, results):
+                if not future.done():
+                    future.set_result(detections)
+
+
+def _image_key(image_bytes: bytes) -> bytes:
+    return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+
+# Threads currently inside ``_mmap_torch_load``; the torch.load wrapper only
+# changes behaviour for them, so concurrent loads elsewhere are unaffected
+_MMAP_STATE = threading.local()
+_MMAP_PATCH_LOCK = threading.Lock()
+_mmap_load_installed = False
+
+
+def _install_mmap_torch_load() -> None:
+    """Wrap ``torch.load`` once; the wrapper is inert outside ``_mmap_torch_load``."""
+    global _mmap_load_installed
+    with _MMAP_PATCH_LOCK:
+        if _mmap_load_installed:
+            return
+        original_load = torch.load
+
+        def load(f, *args, **kwargs):
+            if getattr(_MMAP_STATE, "active", False) and isinstance(f, (str, Path)):
+                kwargs.setdefault("mmap", True)
+            return original_load(f, *args, **kwargs)
+
+        torch.load = load
+        _mmap_load_installed = True
+
+
+@contextmanager
+def _mmap_torch_load():
+    """Make ``torch.load`` memory-map checkpoint files for the duration of the block.
+
+    Ultralytics hides its ``torch.load`` call inside ``YOLO()``, so the flag is
+    injected here; pages are then read on demand instead of copied into RAM.
+    Only the calling thread is affected: the module-global ``torch.load`` is
+    wrapped once and never swapped back and forth.
+    """
+    if torch is None or not settings.CV_MMAP_WEIGHTS:
+        yield
+        return
+
+    _install_mmap_torch_load()
+    previous = getattr(_MMAP_STATE, "active", False)
+    _MMAP_STATE.active = True
+    try:
+        yield
+    finally:
+        _MMAP_STATE.active = previous
+
+
+@contextmanager
+def _export_lock(lock_path: Path):
+    """Hold an exclusive file lock so concurrent workers export an engine only once."""
+    with open(lock_path, "w") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
 class DetectionService:
     """Service responsible for food detection and freshness checks.
     
@@ -47,10 +349,29 @@ class DetectionService:
         self._secondary_model: Optional[YOLO] = None
         self._primary_class_names: Dict[int, str] = {}
         self._secondary_class_names: Dict[int, str] = {}
+        # (labels, categories) object arrays indexed by class id, built at load time
+        self._primary_lookup: Optional[LabelLookup] = None
+        self._secondary_lookup: Optional[LabelLookup] = None
         self._primary_model_error: Optional[str] = None
         self._secondary_model_error: Optional[str] = None
         self._use_ensemble: bool = getattr(settings, "CV_USE_ENSEMBLE", False)
+        self._cuda_autocast: bool = (
+            settings.CV_CUDA_AUTOCAST and torch is not None and torch.cuda.is_available()
+        )
+        # One thread per model so ensemble latency is max(primary, secondary), not the sum;
+        # torch releases the GIL inside inference
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="detect")
+        # Per-model async batchers (keyed by is_primary), created on first async use
+        self._batchers: Dict[bool, _DetectionBatcher] = {}
+        # image digest -> (primary, secondary) raw detections, shared by every API
+        # that runs both models so a repeated image costs no extra forward passes
+        self._runs: Optional[Any] = (
+            LRUCache(maxsize=settings.CV_RESULT_CACHE_SIZE) if LRUCache is not None else None
+        )
+        self._runs_lock = threading.Lock()
         self._load_models()
+        if settings.CV_WARMUP:
+            self._warmup_models()
         # Apply ensemble setting from config after models are loaded
         if self._use_ensemble:
             self.set_ensemble_mode(True)
@@ -149,15 +470,23 @@ class DetectionService:
                 LOGGER.warning("Failed to read %s: %s", yaml_path, exc)
 
         try:
-            model = YOLO(str(model_path))
+            weights_path = self._resolve_runtime_weights(model_path, yaml_path)
+            model = _MODEL_CACHE.get(
+                weights_path,
+                _inference_device(),
+                lambda: self._use_channels_last(self._load_yolo(weights_path)),
+            )
+            lookup = self._build_label_lookup(model, class_names)
             if is_primary:
                 self._primary_model = model
                 self._primary_class_names = class_names
-                LOGGER.info("Loaded PRIMARY detection model from %s", model_path)
+                self._primary_lookup = lookup
+                LOGGER.info("Loaded PRIMARY detection model from %s", weights_path)
             else:
                 self._secondary_model = model
                 self._secondary_class_names = class_names
-                LOGGER.info("Loaded SECONDARY detection model from %s", model_path)
+                self._secondary_lookup = lookup
+                LOGGER.info("Loaded SECONDARY detection model from %s", weights_path)
         except Exception as exc:
             error_msg = f"Failed to load detection model from {model_path}: {exc}"
             if is_primary:
@@ -168,6 +497,164 @@ class DetectionService:
                 self._secondary_model = None
             LOGGER.exception(error_msg)
 
+    def _warmup_models(self) -> None:
+        """Run one dummy inference per model so the first request does not pay
+        for cuDNN autotuning, TensorRT plan deserialization and weight upload."""
+        if np is None:
+            return
+        size = settings.CV_IMAGE_SIZE
+        dummy = np.zeros((size, size, 3), dtype=np.uint8)
+        for name, model in (("primary", self._primary_model), ("secondary", self._secondary_model)):
+            if model is None:
+                continue
+            try:
+                model(dummy, verbose=False)
+            except Exception as exc:
+                LOGGER.warning("Warm-up of %s model failed: %s", name, exc)
+
+    def _build_label_lookup(self, model: YOLO, class_names: Dict[int, str]) -> LabelLookup:
+        """Precompute label and category per class id so detection is a single array gather."""
+        model_names = getattr(model, "names", None) or {}
+        size = max(len(model_names), max(class_names, default=-1) + 1)
+        labels = [class_names.get(idx, f"class_{idx}") for idx in range(size)]
+        return (
+            np.array(labels, dtype=object),
+            np.array([self._category_from_label(label) for label in labels], dtype=object),
+        )
+
+    def _use_channels_last(self, model: YOLO) -> YOLO:
+        """Store conv weights NHWC so fp16 convolutions hit Tensor Core kernels."""
+        if not self._cuda_autocast:
+            return model
+        module = getattr(model, "model", None)
+        if isinstance(module, torch.nn.Module):  # TensorRT engines have no torch module
+            model.model = module.to(memory_format=torch.channels_last)
+        return model
+
+    def _inference_context(self) -> Any:
+        """inference_mode + fp16 autocast on CUDA; a no-op elsewhere."""
+        if not self._cuda_autocast:
+            return nullcontext()
+        stack = ExitStack()
+        stack.enter_context(torch.inference_mode())
+        stack.enter_context(torch.autocast(device_type="cuda", dtype=torch.float16))
+        return stack
+
+    def _load_yolo(self, weights_path: Path) -> YOLO:
+        """Build the YOLO wrapper, reusing a pickled snapshot of it when enabled.
+
+        The snapshot skips Ultralytics' checkpoint/config reconstruction on
+        restart. It is rebuilt whenever the weights are newer than it, and
+        only used for ``.pt`` weights (TensorRT engines load directly).
+        """
+        if weights_path.suffix != ".pt":
+            return YOLO(str(weights_path), task="detect")
+        if not settings.CV_ENABLE_SERIALIZED_CACHE:
+            with _mmap_torch_load():
+                return YOLO(str(weights_path), task="detect")
+
+        cache_path = weights_path.with_suffix(".cached.pt")
+        if cache_path.exists() and cache_path.stat().st_mtime >= weights_path.stat().st_mtime:
+            try:
+                # weights_only=False unpickles code; acceptable for our own local files
+                return torch.load(str(cache_path), map_location="cpu", weights_only=False)
+            except Exception as exc:
+                LOGGER.warning("Ignoring unreadable model snapshot %s: %s", cache_path, exc)
+
+        with _mmap_torch_load():
+            model = YOLO(str(weights_path), task="detect")
+        try:
+            torch.save(model, str(cache_path))
+        except Exception as exc:
+            LOGGER.warning("Could not write model snapshot %s: %s", cache_path, exc)
+        return model
+
+    def _resolve_runtime_weights(self, model_path: Path, yaml_path: Path) -> Path:
+        """Return a TensorRT engine for ``model_path`` when enabled, exporting it once.
+
+        The engine is written next to the ``.pt`` weights and reused on later
+        starts. INT8 engines are calibrated on the dataset ``yaml_path`` points
+        to and kept under their own ``.int8.engine`` name. Any failure (no CUDA,
+        TensorRT missing, export error) falls back to the original weights.
+        """
+        if not settings.CV_USE_TENSORRT:
+            return model_path
+
+        int8 = settings.CV_TENSORRT_INT8
+        engine_path = model_path.with_suffix(".int8.engine" if int8 else ".engine")
+        if engine_path.exists():
+            return engine_path
+
+        try:
+            if torch is None or not torch.cuda.is_available():
+                LOGGER.warning("TensorRT requested but CUDA is unavailable; using %s", model_path.name)
+                return model_path
+
+            # Pascal (sm_6x) and older have no fast FP16 path
+            major, _ = torch.cuda.get_device_capability()
+            half = settings.CV_TENSORRT_HALF and major >= 7 and not int8
+
+            with _export_lock(engine_path.with_suffix(".lock")):
+                if not engine_path.exists():
+                    LOGGER.info(
+                        "Exporting %s to TensorRT (half=%s, int8=%s)", model_path.name, half, int8
+                    )
+                    # Dynamic batch axis so the async batcher can send up to CV_MAX_BATCH images
+                    export_args: Dict[str, Any] = {
+                        "format": "engine",
+                        "half": half,
+                        "dynamic": settings.CV_MAX_BATCH > 1,
+                        "imgsz": settings.CV_IMAGE_SIZE,
+                        "batch": settings.CV_MAX_BATCH,
+                    }
+                    if int8:
+                        export_args.update(int8=True, data=str(yaml_path))
+                    exported = Path(YOLO(str(model_path)).export(**export_args))
+                    if exported != engine_path:
+                        exported.replace(engine_path)
+                    if int8:
+                        self._log_int8_drift(model_path, engine_path, yaml_path)
+        except Exception as exc:
+            LOGGER.warning("TensorRT export failed for %s, using .pt weights: %s", model_path.name, exc)
+            return model_path
+
+        return engine_path if engine_path.exists() else model_path
+
+    def _log_int8_drift(self, model_path: Path, engine_path: Path, yaml_path: Path) -> None:
+        """Compare top confidences of the .pt model and its INT8 engine on a few
+        validation images and warn when quantization shifted them noticeably."""
+        try:
+            yaml_data = yaml.safe_load(yaml_path.read_text(encoding="utf-8")) or {}
+            root = yaml_path.parent / str(yaml_data.get("path", ""))
+            val = yaml_data.get("val")
+            val_dirs = [root / entry for entry in (val if isinstance(val, list) else [val]) if entry]
+            images = [
+                path
+                for val_dir in val_dirs
+                for path in sorted(val_dir.rglob("*"))
+                if path.suffix.lower() in {".jpg", ".jpeg", ".png"}
+            ][: settings.CV_INT8_DRIFT_SAMPLES]
+            if not images:
+                LOGGER.info("No validation images found for INT8 drift check of %s", model_path.name)
+                return
+
+            def top_confidences(model: YOLO) -> "np.ndarray":
+                results = model([str(path) for path in images], verbose=False)
+                return np.array(
+                    [float(r.boxes.conf.max()) if len(r.boxes) else 0.0 for r in results]
+                )
+
+            reference = top_confidences(YOLO(str(model_path)))
+            quantized = top_confidences(YOLO(str(engine_path), task="detect"))
+            drift = float(np.abs(reference - quantized).mean())
+            log = LOGGER.warning if drift > 0.05 else LOGGER.info
+            log(
+                "INT8 drift for %s over %d images: mean |delta conf| = %.3f",
+                model_path.name, len(images), drift,
+            )
+        except Exception as exc:
+            LOGGER.warning("INT8 drift check skipped for %s: %s", model_path.name, exc)
+
     @property
     def model_ready(self) -> bool:
         """Check if at least one model is ready."""
@@ -217,20 +704,21 @@ class DetectionService:
             )
             raise DetectionModelNotReady(message)
 
+        # Ensemble mode: use both models and merge results
+        if self._use_ensemble and self.primary_model_ready and self.secondary_model_ready:
+            primary, secondary = self._run_both_models(image_bytes)
+            return self._merge_ensemble(primary + secondary)
+
         try:
-            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+            image = _decode_image(image_bytes)
         except Exception as exc:
             raise DetectionModelNotReady(f"Failed to decode image: {exc}") from exc
 
-        # Ensemble mode: use both models and merge results
-        if self._use_ensemble and self.primary_model_ready and self.secondary_model_ready:
-            return self._detect_with_ensemble(image)
-
         # Try primary model first
         if self._primary_model is not None:
             try:
                 return self._detect_with_model(
-                    self._primary_model, self._primary_class_names, image
+                    self._primary_model, self._primary_lookup, image
                 )
             except Exception as exc:
                 LOGGER.warning("Primary model failed, trying secondary: %s", exc)
@@ -240,7 +728,7 @@ class DetectionService:
         if self._secondary_model is not None:
             try:
                 return self._detect_with_model(
-                    self._secondary_model, self._secondary_class_names, image
+                    self._secondary_model, self._secondary_lookup, image
                 )
             except Exception as exc:
                 raise DetectionModelNotReady(
@@ -255,65 +743,148 @@ class DetectionService:
         raise DetectionModelNotReady(message)
 
     def _detect_with_model(
-        self, model: YOLO, class_names: Dict[int, str], image: Image.Image
+        self, model: YOLO, lookup: LabelLookup, image: ModelInput
     ) -> List[Dict[str, Any]]:
         """Run detection with a single model."""
-        results = model(image, verbose=False)
-        detections: List[Dict[str, Any]] = []
-        
-        for result in results:
-            boxes = getattr(result, "boxes", None)
-            if not boxes:
-                continue
+        return self._detect_batch(model, lookup, [image])[0]
 
-            cls_list = boxes.cls.tolist() if getattr(boxes, "cls", None) is not None else []
-            conf_list = boxes.conf.tolist() if getattr(boxes, "conf", None) is not None else []
-            xyxy_list = boxes.xyxy.tolist() if getattr(boxes, "xyxy", None) is not None else []
-
-            for cls_idx, confidence, bbox in zip(cls_list, conf_list, xyxy_list):
-                int_cls = int(cls_idx)
-                label = class_names.get(int_cls, f"class_{int_cls}")
-                detections.append(
-                    {
-                        "name": label,
-                        "category": self._category_from_label(label),
-                        "quantity": 1,
-                        "confidence": float(confidence),
-                        "bbox": [float(x) for x in bbox],
-                    }
-                )
+    def _detect_batch(
+        self, model: YOLO, lookup: LabelLookup, images: List[ModelInput]
+    ) -> List[List[Dict[str, Any]]]:
+        """Run one model over several images in a single call; one detection list per image."""
+        prepared = [image if isinstance(image, PreparedImage) else None for image in images]
+        if all(prepared):
+            source = torch.cat([item.tensor for item in prepared])
+        else:
+            source = images if len(images) > 1 else images[0]
+        with self._inference_context():
+            results = model(source, verbose=False)
+        return [
+            self._extract_detections(result, lookup, item)
+            for result, item in zip(results, prepared)
+        ]
 
-        return detections
+    def _extract_detections(
+        self, result: Any, lookup: LabelLookup, prepared: Optional[PreparedImage]
+    ) -> List[Dict[str, Any]]:
+        """Turn one Ultralytics result into detection dicts."""
+        boxes = getattr(result, "boxes", None)
+        if not boxes:
+            return []
 
-    def _detect_with_ensemble(self, image: Image.Image) -> List[Dict[str, Any]]:
-        """
-        Use both models and merge their results.
-        For overlapping detections, keep the one with higher confidence.
-        """
-        primary_detections = self._detect_with_model(
-            self._primary_model, self._primary_class_names, image
-        )
-        secondary_detections = self._detect_with_model(
-            self._secondary_model, self._secondary_class_names, image
-        )
+        # One host copy per tensor, then gather labels/categories for every box at once
+        labels_array, categories_array = lookup
+        cls = boxes.cls.cpu().numpy().astype(np.intp)
+        confs = boxes.conf.cpu().numpy()
+        xyxy = boxes.xyxy.cpu().numpy()
+        if prepared is not None:
+            xyxy = _unletterbox(xyxy, prepared)
+        labels = labels_array[cls]
+        categories = categories_array[cls]
 
-        # Merge detections: combine both lists, preferring higher confidence for duplicates
-        merged: Dict[str, Dict[str, Any]] = {}
-        
-        for det in primary_detections + secondary_detections:
-            name = det["name"].lower()
-            # Use IoU or simple name matching to detect duplicates
-            # For now, simple approach: same name = same detection, keep higher confidence
-            if name not in merged or det["confidence"] > merged[name]["confidence"]:
-                merged[name] = det
+        # tolist() converts each array to Python floats in one C loop; the dicts
+        # are stored in Mongo and validated by Pydantic, so NumPy scalars can't leak
+        return [
+            {
+                "name": label,
+                "category": category,
+                "quantity": 1,
+                "confidence": confidence,
+                "bbox": bbox,
+            }
+            for label, category, confidence, bbox in zip(
+                labels.tolist(), categories.tolist(), confs.tolist(), xyxy.tolist()
+            )
+        ]
+
+    def _run_both_models(
+        self, image_bytes: bytes
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Raw (primary, secondary) detections for an image, memoized by content."""
+        key = _image_key(image_bytes)
+        cached = self._cached_run(key)
+        if cached is not None:
+            return cached
+
+        image = self.prepare_image(image_bytes)
+        primary_future = self._executor.submit(self._safe_detect, True, image)
+        secondary_future = self._executor.submit(self._safe_detect, False, image)
+        return self._store_run(key, primary_future.result(), secondary_future.result())
+
+    def _safe_detect(self, is_primary: bool, image: ModelInput) -> Optional[List[Dict[str, Any]]]:
+        """Run one model; ``[]`` if it is not loaded, ``None`` if it failed."""
+        model, lookup = self._model_and_lookup(is_primary)
+        if model is None:
+            return []
+        try:
+            return self._detect_with_model(model, lookup, image)
+        except Exception as exc:
+            LOGGER.warning("%s model failed: %s", "Primary" if is_primary else "Secondary", exc)
+            return None
 
-        return list(merged.values())
+    def _model_and_lookup(self, is_primary: bool) -> Tuple[Optional[YOLO], Optional[LabelLookup]]:
+        if is_primary:
+            return self._primary_model, self._primary_lookup
+        return self._secondary_model, self._secondary_lookup
+
+    def _cached_run(self, key: bytes) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        if self._runs is None:
+            return None
+        with self._runs_lock:
+            return self._runs.get(key)
+
+    def _store_run(
+        self,
+        key: bytes,
+        primary: Optional[List[Dict[str, Any]]],
+        secondary: Optional[List[Dict[str, Any]]],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        run = (primary or [], secondary or [])
+        # Failed runs are not memoized so a retry gets a fresh attempt
+        if self._runs is not None and primary is not None and secondary is not None:
+            with self._runs_lock:
+                self._runs[key] = run
+        return run
+
+    def _merge_ensemble(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge the concatenated detections of both models."""
+        if not detections:
+            return []
+
+        if batched_nms is None:
+            # Without torchvision, fall back to keeping the most confident box per name
+            merged: Dict[str, Dict[str, Any]] = {}
+            for det in detections:
+                name = det["name"].lower()
+                if name not in merged or det["confidence"] > merged[name]["confidence"]:
+                    merged[name] = det
+            return list(merged.values())
+
+        # Class-aware NMS over both models' boxes: overlapping same-label boxes collapse
+        # to the higher-scoring one, while distinct objects with the same label survive
+        label_ids: Dict[str, int] = {}
+        boxes = torch.tensor([det["bbox"] for det in detections], dtype=torch.float32)
+        scores = torch.tensor([det["confidence"] for det in detections], dtype=torch.float32)
+        idxs = torch.tensor(
+            [label_ids.setdefault(det["name"].lower(), len(label_ids)) for det in detections]
+        )
+        keep = batched_nms(boxes, scores, idxs, settings.CV_ENSEMBLE_IOU)
+        return [detections[i] for i in keep.tolist()]
 
     def detect_ingredients_both_models(self, image_bytes: bytes) -> Dict[str, Any]:
         """
         Detect ingredients using both models separately and return results from each.
         Returns a dict with 'model1' and 'model2' results, with duplicates grouped and counted.
         """
+        primary, secondary = self._run_both_models(image_bytes)
+        return {
+            "model1": self._group_and_count_detections(primary),
+            "model2": self._group_and_count_detections(secondary),
+        }
+
+    def prepare_image(self, image_bytes: bytes) -> ModelInput:
+        """Validate the payload and model availability, then decode and preprocess
+        the image once so both models can share it."""
         if not image_bytes:
             raise DetectionModelNotReady("Image payload was empty.")
 
@@ -325,40 +896,66 @@ class DetectionService:
             raise DetectionModelNotReady(message)
 
         try:
-            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+            image = _decode_image(image_bytes)
         except Exception as exc:
             raise DetectionModelNotReady(f"Failed to decode image: {exc}") from exc
+        return self._preprocess(image)
 
-        result = {
-            "model1": [],
-            "model2": [],
-        }
+    def _preprocess(self, image: ModelInput) -> ModelInput:
+        """Letterbox an OpenCV image into a model-ready tensor; anything else passes through."""
+        if isinstance(image, PreparedImage) or cv2 is None or torch is None:
+            return image
+        if not isinstance(image, np.ndarray):
+            return image
+        return _letterbox(image, settings.CV_IMAGE_SIZE)
 
-        # Run primary model (Model 1)
-        if self._primary_model is not None:
-            try:
-                raw_detections = self._detect_with_model(
-                    self._primary_model, self._primary_class_names, image
-                )
-                # Group duplicates and count
-                result["model1"] = self._group_and_count_detections(raw_detections)
-            except Exception as exc:
-                LOGGER.warning("Primary model failed: %s", exc)
-                result["model1"] = []
+    # ------------------------------------------------------------------
+    # Async API: concurrent requests share batched model calls
+    # ------------------------------------------------------------------
+    def _batcher(self, is_primary: bool) -> _DetectionBatcher:
+        batcher = self._batchers.get(is_primary)
+        if batcher is None:
+            run_batch = partial(self._detect_batch, *self._model_and_lookup(is_primary))
+            batcher = _DetectionBatcher(
+                run_batch, settings.CV_MAX_BATCH, settings.CV_BATCH_WINDOW_MS / 1000
+            )
+            self._batchers[is_primary] = batcher
+        return batcher
 
-        # Run secondary model (Model 2)
-        if self._secondary_model is not None:
-            try:
-                raw_detections = self._detect_with_model(
-                    self._secondary_model, self._secondary_class_names, image
-                )
-                # Group duplicates and count
-                result["model2"] = self._group_and_count_detections(raw_detections)
-            except Exception as exc:
-                LOGGER.warning("Secondary model failed: %s", exc)
-                result["model2"] = []
+    async def _run_both_models_async(
+        self, image_bytes: bytes
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Async, batched counterpart of :meth:`_run_both_models` sharing its memo."""
+        key = _image_key(image_bytes)
+        cached = self._cached_run(key)
+        if cached is not None:
+            return cached
+
+        image = await asyncio.to_thread(self.prepare_image, image_bytes)
+        primary, secondary = await asyncio.gather(
+            self._safe_detect_async(True, image), self._safe_detect_async(False, image)
+        )
+        return self._store_run(key, primary, secondary)
 
-        return result
+    async def _safe_detect_async(
+        self, is_primary: bool, image: ModelInput
+    ) -> Optional[List[Dict[str, Any]]]:
+        model, _ = self._model_and_lookup(is_primary)
+        if model is None:
+            return []
+        try:
+            return await self._batcher(is_primary).submit(image)
+        except Exception as exc:
+            LOGGER.warning("%s model failed: %s", "Primary" if is_primary else "Secondary", exc)
+            return None
+
+    async def detect_ingredients_both_models_async(self, image_bytes: bytes) -> Dict[str, Any]:
+        """Async counterpart of :meth:`detect_ingredients_both_models`."""
+        primary, secondary = await self._run_both_models_async(image_bytes)
+        return {
+            "model1": self._group_and_count_detections(primary),
+            "model2": self._group_and_count_detections(secondary),
+        }
 
     def detect_ingredients_real(self, image_bytes: bytes) -> List[Dict[str, Any]]:
         """Backward-compatible alias for the real detector."""
@@ -385,6 +982,12 @@ class DetectionService:
         confidence = round(random.uniform(0.80, 0.98), 2)
         return freshness, confidence
 
+    def check_freshness_mock_batch(
+        self, image_bytes: bytes, item_names: List[str]
+    ) -> List[Tuple[str, float]]:  # pragma: no cover
+        """Check freshness for several items detected in the same image in one call."""
+        return [self.check_freshness_mock(image_bytes, name) for name in item_names]
+
     def check_freshness_real(self, image_bytes: bytes, item_name: str) -> Tuple[str, float]:
         raise NotImplementedError("Replace this with actual classifier integration!")
 
@@ -394,99 +997,53 @@ class DetectionService:
     def _category_from_label(self, label: str) -> str:
         """Map detected labels to categories based on data.yaml items."""
         lower_label = label.lower().strip()
-        
-        # Fruits
-        fruits = ["apple", "banana", "blue berry", "stawberry", "strawberry", "lemon", "orange"]
-        # Vegetables
-        vegetables = [
-            "brinjal", "cabbage", "capsicum", "carrot", "corn", "cucumber",
-            "ginger", "green beans", "green chilly", "green leaves", "lettuce",
-            "mushroom", "potato", "sweet potato", "tomato", "spinach", "broccoli"
-        ]
-        # Dairy
-        dairy = ["milk", "cheese", "butter", "fresh cream", "yogurt", "egg"]
-        # Meat/Protein
-        meat = ["chicken", "meat", "shrimp"]
-        # Grains/Bakery
-        grains = ["bread", "flour"]
-        # Other
-        other = ["chocolate"]
-        
+
         # Check exact matches first
-        if lower_label in fruits:
-            return "fruits"
-        if lower_label in vegetables:
-            return "vegetables"
-        if lower_label in dairy:
-            return "dairy"
-        if lower_label in meat:
-            return "meat"
-        if lower_label in grains:
-            return "grains"
-        if lower_label in other:
-            return "other"
-        
-        # Check partial matches
-        for fruit in fruits:
-            if fruit in lower_label:
-                return "fruits"
-        for veg in vegetables:
-            if veg in lower_label:
-                return "vegetables"
-        for d in dairy:
-            if d in lower_label:
-                return "dairy"
-        for m in meat:
-            if m in lower_label:
-                return "meat"
-        for g in grains:
-            if g in lower_label:
-                return "grains"
-        
-        # Fallback patterns
-        if "fruit" in lower_label or "berry" in lower_label:
-            return "fruits"
-        if "veg" in lower_label or "leaf" in lower_label:
-            return "vegetables"
-        if "milk" in lower_label or "cream" in lower_label or "cheese" in lower_label:
-            return "dairy"
-        if "chicken" in lower_label or "meat" in lower_label or "fish" in lower_label or "shrimp" in lower_label:
-            return "meat"
-        if "bread" in lower_label or "flour" in lower_label or "grain" in lower_label:
-            return "grains"
-        
+        category = _EXACT_CATEGORY.get(lower_label)
+        if category is not None:
+            return category
+
+        # Then partial matches, then broader fallback patterns, in category order
+        for patterns in (_PARTIAL_PATTERNS, _FALLBACK_PATTERNS):
+            for category, pattern in patterns:
+                if pattern.search(lower_label):
+                    return category
+
         return "uncategorized"
     
     def _group_and_count_detections(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Group duplicate detections and count them."""
-        grouped: Dict[str, Dict[str, Any]] = {}
-        
-        for det in detections:
-            name = det["name"].lower().strip()
-            category = det.get("category", "uncategorized")
-            
-            # Use name+category as key to group
-            key = f"{name}_{category}"
-            
-            if key in grouped:
-                # Increment quantity
-                grouped[key]["quantity"] += 1
-                # Update confidence to average (or keep max)
-                existing_conf = grouped[key].get("confidence", 0.0)
-                new_conf = det.get("confidence", 0.0)
-                grouped[key]["confidence"] = max(existing_conf, new_conf)  # Keep highest confidence
-            else:
-                # First occurrence
-                grouped[key] = {
-                    "name": det["name"],
-                    "category": category,
-                    "quantity": 1,
+        if not detections:
+            return []
+
+        # Use name+category as key to group
+        keys = np.array(
+            [f"{det['name'].lower().strip()}_{det.get('category', 'uncategorized')}" for det in detections]
+        )
+        confs = np.array([det.get("confidence", 0.0) for det in detections], dtype=np.float64)
+
+        # Count per key and keep the highest confidence in one vectorized pass
+        _, first_index, inverse, counts = np.unique(
+            keys, return_index=True, return_inverse=True, return_counts=True
+        )
+        max_confs = np.full(len(first_index), -np.inf)
+        np.maximum.at(max_confs, inverse.ravel(), confs)
+
+        grouped: List[Dict[str, Any]] = []
+        # np.unique sorts keys; emit groups in first-seen order like before
+        for group in np.argsort(first_index):
+            first = detections[first_index[group]]
+            grouped.append(
+                {
+                    "name": first["name"],
+                    "category": first.get("category", "uncategorized"),
+                    "quantity": int(counts[group]),
                     "unit": "item",
-                    "confidence": det.get("confidence", 0.0),
-                    "bbox": det.get("bbox", []),
+                    "confidence": float(max_confs[group]),
+                    "bbox": first.get("bbox", []),
                 }
-        
-        return list(grouped.values())
+            )
+        return grouped
 
 
 # Global instance ------------------------------------------------------------
@@ -2,17 +2,37 @@
 Nutrition Service - Wrapper around the Edamam Nutrition Analysis API.
 """
 
+import hashlib
 from typing import List, Dict, Any
 
 import httpx
+import orjson
 
+from app.core.cache import cache_get_json, cache_set_json
 from app.core.config import settings
 
+try:  # Optional in-process cache tier
+    from cachetools import TTLCache
+except Exception:  # pragma: no cover - package not installed
+    TTLCache = None  # type: ignore
+
+try:  # HTTP/2 support for httpx comes from the optional h2 package
+    import h2  # type: ignore  # noqa: F401
+    HTTP2_AVAILABLE = True
+except Exception:  # pragma: no cover - package not installed
+    HTTP2_AVAILABLE = False
+
 
 class NutritionCredentialsError(RuntimeError):
     """Raised when Edamam credentials are not configured."""
 
 
+def _analysis_cache_key(ingredient_lines: List[str]) -> str:
+    """Order-insensitive key for an ingredient list; the title does not affect the analysis."""
+    digest = hashlib.blake2b(orjson.dumps(sorted(ingredient_lines)), digest_size=16).hexdigest()
+    return f"nutrition:{digest}"
+
+
 class NutritionService:
     """Service responsible for obtaining nutrition facts from Edamam."""
 
@@ -20,6 +40,25 @@ class NutritionService:
         self.app_id = settings.EDAMAM_APP_ID
         self.app_key = settings.EDAMAM_API_KEY
         self.base_url = "https://api.edamam.com/api/nutrition-details"
+        # One pooled client for the process so calls reuse the TCP+TLS connection
+        self._client = httpx.AsyncClient(
+            timeout=20.0,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+        # Tier 1 of the response cache; tier 2 is the shared Redis (if configured)
+        self._memory_cache = (
+            TTLCache(
+                maxsize=settings.NUTRITION_MEMORY_CACHE_SIZE,
+                ttl=settings.NUTRITION_MEMORY_CACHE_TTL_SECONDS,
+            )
+            if TTLCache is not None
+            else None
+        )
+
+    async def aclose(self) -> None:
+        """Close pooled connections (called on application shutdown)."""
+        await self._client.aclose()
 
     async def analyze_ingredients(
         self,
@@ -34,7 +73,8 @@ class NutritionService:
             ingredient_lines: List of ingredient strings, e.g. ["2 cups rice"].
 
         Returns:
-            Parsed JSON payload from Edamam.
+            Parsed JSON payload from Edamam (served from cache for ingredient
+            lists analyzed recently).
         """
         if not ingredient_lines:
             raise ValueError("ingredient_lines must contain at least one entry.")
@@ -45,6 +85,18 @@ class NutritionService:
                 "Set EDAMAM_APP_ID and EDAMAM_API_KEY in the backend .env file."
             )
 
+        cache_key = _analysis_cache_key(ingredient_lines)
+        if self._memory_cache is not None:
+            cached = self._memory_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        cached = await cache_get_json(cache_key)
+        if cached is not None:
+            if self._memory_cache is not None:
+                self._memory_cache[cache_key] = cached
+            return cached
+
         params = {
             "app_id": self.app_id,
             "app_key": self.app_key,
@@ -54,10 +106,14 @@ class NutritionService:
             "ingr": ingredient_lines,
         }
 
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            response = await client.post(self.base_url, params=params, json=payload)
-            response.raise_for_status()
-            return response.json()
+        response = await self._client.post(self.base_url, params=params, json=payload)
+        response.raise_for_status()
+        data = response.json()
+
+        if self._memory_cache is not None:
+            self._memory_cache[cache_key] = data
+        await cache_set_json(cache_key, data, settings.NUTRITION_CACHE_TTL_SECONDS)
+        return data
 
 
 # Global instance
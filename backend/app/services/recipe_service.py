@@ -2,17 +2,147 @@
 Recipe Service - Integrates with TheMealDB API and provides recipe suggestions.
 """
 
+import asyncio
+import heapq
+import logging
+import re
+
 import httpx
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import Awaitable, Callable, FrozenSet, List, Dict, Any, Optional, NamedTuple, Set, Tuple, TypeVar
 
 from app.core.config import settings
+from app.services.themealdb_vocab import THEMEALDB_VOCAB as _THEMEALDB_VOCAB
+
+try:  # Optional in-process cache of TheMealDB responses
+    from cachetools import LRUCache, TTLCache
+except Exception:  # pragma: no cover - package not installed
+    LRUCache = TTLCache = None  # type: ignore
+
+try:  # Optional native fuzzy matcher for ingredient overlap
+    from rapidfuzz import fuzz, process, utils as fuzz_utils
+except Exception:  # pragma: no cover - package not installed
+    process = None  # type: ignore
+
+try:  # HTTP/2 support for httpx comes from the optional h2 package
+    import h2  # type: ignore  # noqa: F401
+    HTTP2_AVAILABLE = True
+except Exception:  # pragma: no cover - package not installed
+    HTTP2_AVAILABLE = False
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Ingredient names TheMealDB only knows by a broader term
+_MANUAL_MAP: Dict[str, Tuple[str, ...]] = {
+    "chicken breast": ("chicken",),
+    "baby spinach": ("spinach",),
+    "greek yogurt": ("yogurt",),
+}
+_MANUAL_PREFIXES = tuple(_MANUAL_MAP)
+
+
+def _derived_terms(value: str) -> List[str]:
+    """Return the broader terms worth querying for ``value`` (may repeat)."""
+    terms: List[str] = []
+    # One C-level prefix test rules out the common case before scanning the map
+    if value.startswith(_MANUAL_PREFIXES):
+        for key, extras in _MANUAL_MAP.items():
+            if value.startswith(key):
+                terms.extend(extras)
+    # Single words only help if TheMealDB has an ingredient by that name;
+    # "with" or "baby" would just be wasted filter calls and false matches
+    terms.extend(word for word in value.replace("-", " ").split() if word in _THEMEALDB_VOCAB)
+    return terms
+
+
+# TheMealDB spreads ingredients over 20 numbered fields per meal
+_ING_KEYS = tuple(f"strIngredient{idx}" for idx in range(1, 21))
+_MEAS_KEYS = tuple(f"strMeasure{idx}" for idx in range(1, 21))
+
+# token_set_ratio score at which a recipe ingredient counts as "on hand"
+MATCH_SCORE_CUTOFF = 80
+
+
+class _AvailableIndex(NamedTuple):
+    """Available ingredient names, preprocessed once per search."""
+
+    names: Tuple[str, ...]  # choices for the RapidFuzz batch
+    whole: FrozenSet[str]  # the same names, for hashed lookups
+    grams: FrozenSet[str]  # every word and adjacent word pair inside them
+
+
+def _process_name(value: str) -> str:
+    """Normalize like RapidFuzz's default_process (lower-case, alphanumerics only)."""
+    if process is not None:
+        return fuzz_utils.default_process(value)
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", value.lower()).split())
+
+
+def _word_grams(name: str) -> List[str]:
+    words = name.split()
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def _index_hit(name: str, available: _AvailableIndex) -> bool:
+    """Exact token-subset match between ``name`` and some available name.
+
+    Either an available name appears among the words/pairs of ``name`` ("olive
+    oil" in "extra virgin olive oil"), or ``name`` appears inside an available
+    name ("chicken" in "chicken breast"). token_set_ratio scores both cases
+    100, so a hit settles the ingredient without the fuzzy batch.
+    """
+    return name in available.grams or any(
+        gram in available.whole for gram in _word_grams(name)
+    )
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Keep-alive client for TheMealDB, shared by every request in a worker."""
+    return httpx.AsyncClient(
+        timeout=10.0,
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+    )
 
 
 class RecipeService:
     """Service for ingredient-based recipe search using TheMealDB."""
 
-    def __init__(self):
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
         self.base_url = settings.THEMEALDB_BASE_URL.rstrip("/")
+        self._http = http
+        # (namespace, key) -> in-flight upstream fetch shared by concurrent callers
+        self._inflight: Dict[Tuple[str, str], "asyncio.Task[Any]"] = {}
+        # TheMealDB data changes rarely, so repeat ingredients and meal ids are
+        # answered in-process; failed fetches are never cached
+        self._caches: Dict[str, Any] = (
+            {
+                "filter": TTLCache(maxsize=2048, ttl=settings.THEMEALDB_FILTER_CACHE_TTL_SECONDS),
+                "lookup": TTLCache(maxsize=4096, ttl=settings.THEMEALDB_LOOKUP_CACHE_TTL_SECONDS),
+                "search": TTLCache(maxsize=512, ttl=settings.THEMEALDB_SEARCH_CACHE_TTL_SECONDS),
+            }
+            if TTLCache is not None
+            else {}
+        )
+        # idMeal -> parsed meal; a meal's payload doesn't change, so neither does
+        # its parse. Entries are shared between callers and must not be mutated.
+        self._parsed: Optional[Any] = LRUCache(maxsize=4096) if LRUCache is not None else None
+        # Created on first use so it binds to the serving event loop
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._sem_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared keep-alive client; created lazily if the app did not bind one."""
+        if self._http is None:
+            self._http = create_http_client()
+        return self._http
+
+    @http.setter
+    def http(self, client: httpx.AsyncClient) -> None:
+        self._http = client
 
     async def search_by_ingredients(
         self,
@@ -23,111 +153,122 @@ class RecipeService:
         Search recipes by available ingredients using TheMealDB.
         Returns a list of detailed recipe dicts with match metadata.
         """
-        base_ingredients = [
-            ing.strip().lower()
-            for ing in dict.fromkeys(ingredients)
-            if ing and ing.strip()
-        ]
+        # Normalize first so "Egg" and "egg " collapse, keeping first-seen order
+        seen: Set[str] = set()
+        base_ingredients: List[str] = []
+        for ing in ingredients:
+            name = ing.strip().lower() if ing else ""
+            if name and name not in seen:
+                seen.add(name)
+                base_ingredients.append(name)
 
         if not base_ingredients:
             return self._fallback_recipes()
 
-        def expand_terms(value: str) -> List[str]:
-            terms = {value}
-            manual_map = {
-                "chicken breast": ["chicken"],
-                "baby spinach": ["spinach"],
-                "greek yogurt": ["yogurt"],
-            }
-            for key, extras in manual_map.items():
-                if value.startswith(key):
-                    terms.update(extras)
-            words = [w for w in value.replace("-", " ").split(" ") if w]
-            if words:
-                terms.update(words)
-            return list(dict.fromkeys(filter(None, terms)))
-
-        expanded_ingredients = []
+        # Names as given come first, then derived broader terms, deduped as they
+        # are produced. filter.php matches exact ingredient names, so a specific
+        # name and its broader term find different meals and both are kept.
+        unique_ingredients = list(base_ingredients)
         for ingredient in base_ingredients:
-            expanded_ingredients.extend(expand_terms(ingredient))
-
-        unique_ingredients = list(dict.fromkeys(expanded_ingredients))
+            for term in _derived_terms(ingredient):
+                if term not in seen:
+                    seen.add(term)
+                    unique_ingredients.append(term)
 
         meal_matches: Dict[str, Dict[str, Any]] = {}
 
-        async with httpx.AsyncClient() as client:
-            # Gather candidate meals for each ingredient
-            for ingredient in unique_ingredients:
-                try:
-                    resp = await client.get(
-                        f"{self.base_url}/filter.php",
-                        params={"i": ingredient},
-                        timeout=10.0,
-                    )
-                    resp.raise_for_status()
-                    data = resp.json()
-                except Exception as exc:
-                    print(f"TheMealDB filter error ({ingredient}): {exc}")
-                    data = {}
-
-                for meal in data.get("meals") or []:
-                    meal_id = meal.get("idMeal")
-                    if not meal_id:
-                        continue
-                    entry = meal_matches.setdefault(
-                        meal_id,
-                        {"count": 0, "meal": meal},
-                    )
-                    entry["count"] += 1
-
-            if not meal_matches:
-                return []
-
-            # Pick top matches by overlap count
-            sorted_candidates = sorted(
-                meal_matches.items(),
-                key=lambda item: item[1]["count"],
-                reverse=True,
-            )[: number * 2]  # fetch extra to account for missing details
-
-            results: List[Dict[str, Any]] = []
-            for meal_id, entry in sorted_candidates:
-                detail = await self._get_meal_details(client, meal_id)
-                if not detail:
+        # Gather candidate meals for each ingredient; the filter calls are
+        # independent, so issue them together and fold the results in order.
+        # Cap the fan-out so a large pantry can't turn one search into dozens
+        # of cold calls; the full term list is still used for matching.
+        query_terms = unique_ingredients[: settings.THEMEALDB_MAX_FILTER_TERMS]
+        filtered = await asyncio.gather(
+            *(self._filter("i", ingredient) for ingredient in query_terms)
+        )
+        for data in filtered:
+            for meal in data.get("meals") or []:
+                meal_id = meal.get("idMeal")
+                if not meal_id:
                     continue
-
-                parsed = self._parse_meal(detail)
-                match_info = self._calculate_match(parsed["ingredient_names"], unique_ingredients)
-
-                results.append(
-                    {
-                        "id": meal_id,
-                        "title": parsed["title"],
-                        "image": parsed["image"],
-                        "category": parsed["category"],
-                        "area": parsed["area"],
-                        "ingredients": parsed["ingredients"],
-                        "instructions": parsed["instructions"],
-                        "used_ingredients": match_info["used"],
-                        "missed_ingredients": match_info["missed"],
-                        "match_percentage": match_info["match_percentage"],
-                        "servings": parsed.get("servings"),
-                        "cooking_time": parsed.get("cooking_time"),
-                    }
+                entry = meal_matches.setdefault(
+                    meal_id,
+                    {"count": 0, "meal": meal},
                 )
+                entry["count"] += 1
+
+        if not meal_matches:
+            return []
+
+        # Pick top matches by overlap count; only the head is needed, so select
+        # it with a bounded heap instead of sorting every candidate
+        sorted_candidates = heapq.nlargest(
+            number * 2,  # fetch extra to account for missing details
+            meal_matches.items(),
+            key=lambda item: item[1]["count"],
+        )
+
+        # Normalize the pantry side once; every candidate is scored against it
+        available = self._normalize_available(unique_ingredients)
+
+        # Look up only as many candidates as results are still missing: the
+        # first wave asks for ``number`` and later waves just replace failures,
+        # so the spare candidates cost nothing unless they're actually needed
+        fetched: List[Tuple[str, Dict[str, Any]]] = []
+        next_idx = 0
+        while len(fetched) < number and next_idx < len(sorted_candidates):
+            wave = sorted_candidates[next_idx : next_idx + number - len(fetched)]
+            next_idx += len(wave)
+            details = await asyncio.gather(
+                *(self._get_meal_details(meal_id) for meal_id, _ in wave)
+            )
+            fetched.extend(
+                (meal_id, detail) for (meal_id, _), detail in zip(wave, details) if detail
+            )
+
+        results: List[Dict[str, Any]] = []
+        for meal_id, detail in fetched:
+            parsed = self._parse_meal(detail)
+            match_info = self._calculate_match(parsed["ingredient_names"], available)
+
+            results.append(
+                {
+                    "id": meal_id,
+                    "title": parsed["title"],
+                    "image": parsed["image"],
+                    "category": parsed["category"],
+                    "area": parsed["area"],
+                    "ingredients": parsed["ingredients"],
+                    "instructions": parsed["instructions"],
+                    "used_ingredients": match_info["used"],
+                    "missed_ingredients": match_info["missed"],
+                    "match_percentage": match_info["match_percentage"],
+                    "servings": parsed.get("servings"),
+                    "cooking_time": parsed.get("cooking_time"),
+                }
+            )
 
         if not results:
             return self._fallback_recipes()
 
-        return sorted(results, key=lambda item: item.get("match_percentage", 0), reverse=True)[:number]
+        # Detail waves cap ``results`` at ``number``, so this is a full ranking of
+        # a short list rather than a top-k selection
+        results.sort(key=lambda item: item.get("match_percentage", 0), reverse=True)
+        return results
 
     async def get_recipe_details(self, recipe_id: str) -> Optional[Dict[str, Any]]:
-        """Fetch a full recipe record from TheMealDB."""
+        """Fetch a full recipe record from TheMealDB.
+
+        Concurrent calls for the same id share a single upstream request.
+        """
+        return await self._single_flight(
+            ("recipe", recipe_id), lambda: self._fetch_recipe_details(recipe_id)
+        )
+
+    async def _fetch_recipe_details(self, recipe_id: str) -> Optional[Dict[str, Any]]:
         try:
-            async with httpx.AsyncClient() as client:
-                detail = await self._get_meal_details(client, recipe_id)
+            detail = await self._get_meal_details(recipe_id)
         except Exception as exc:
-            print(f"TheMealDB lookup error ({recipe_id}): {exc}")
+            LOGGER.warning("TheMealDB lookup error (%s): %s", recipe_id, exc)
             detail = None
 
         if not detail:
@@ -160,37 +301,17 @@ class RecipeService:
         if not category:
             return []
 
-        try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    f"{self.base_url}/filter.php",
-                    params={"c": category},
-                    timeout=10.0,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                return data.get("meals", [])[:number]
-        except Exception as exc:
-            print(f"TheMealDB similar error ({category}): {exc}")
-            return []
+        data = await self._filter("c", category)
+        return (data.get("meals") or [])[:number]
 
     async def search_by_name(self, query: str, number: int = 10) -> List[Dict[str, Any]]:
         """Search recipes by name."""
         if not query:
             return []
 
-        try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    f"{self.base_url}/search.php",
-                    params={"s": query},
-                    timeout=10.0,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-        except Exception as exc:
-            print(f"TheMealDB search error ({query}): {exc}")
-            data = {}
+        data = await self._cached_fetch(
+            "search", query, lambda: self._get_json("search", "s", query, "search")
+        ) or {}
 
         meals = data.get("meals") or []
         results = []
@@ -212,38 +333,113 @@ class RecipeService:
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
-    async def _get_meal_details(self, client: httpx.AsyncClient, meal_id: str) -> Optional[Dict[str, Any]]:
+    async def _bounded(self, request: Awaitable[T]) -> T:
+        """Await an upstream call while holding one of the concurrency slots.
+
+        Gathered searches fan out to dozens of requests; capping them keeps
+        TheMealDB from answering with 429s or dropped connections.
+        """
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(settings.THEMEALDB_MAX_CONCURRENCY)
+            self._sem_loop = loop
+        async with self._sem:
+            return await request
+
+    async def _single_flight(
+        self, flight: Tuple[str, str], fetch: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Share one upstream fetch between concurrent callers asking for the same thing."""
+        task = self._inflight.get(flight)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[flight] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight, None))
+        # Shield so one caller going away does not cancel the fetch for the rest
+        return await asyncio.shield(task)
+
+    async def _cached_fetch(
+        self, namespace: str, key: str, fetch: Callable[[], Awaitable[Optional[T]]]
+    ) -> Optional[T]:
+        """Serve ``key`` from the namespace's TTL cache, fetching once on a miss."""
+        cache = self._caches.get(namespace)
+        if cache is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+
+        async def fill() -> Optional[T]:
+            value = await fetch()
+            if cache is not None and value is not None:
+                cache[key] = value
+            return value
+
+        return await self._single_flight((namespace, key), fill)
+
+    async def _get_json(
+        self, endpoint: str, param: str, value: str, label: str
+    ) -> Optional[Dict[str, Any]]:
+        """GET ``/{endpoint}.php?{param}={value}``; ``None`` on any failure."""
         try:
-            resp = await client.get(
-                f"{self.base_url}/lookup.php",
-                params={"i": meal_id},
-                timeout=10.0,
+            resp = await self._bounded(
+                self.http.get(
+                    f"{self.base_url}/{endpoint}.php",
+                    params={param: value},
+                    timeout=10.0,
+                )
             )
             resp.raise_for_status()
-            data = resp.json()
-            meals = data.get("meals")
-            if isinstance(meals, list) and meals:
-                return meals[0]
+            # Parse the raw bytes directly; skips httpx's decode-to-str + stdlib json
+            return orjson.loads(resp.content)
         except Exception as exc:
-            print(f"TheMealDB lookup error ({meal_id}): {exc}")
+            LOGGER.warning("TheMealDB %s error (%s): %s", label, value, exc)
+            return None
+
+    async def _filter(self, kind: str, value: str) -> Dict[str, Any]:
+        """filter.php by ingredient (``kind="i"``) or category (``kind="c"``)."""
+        data = await self._cached_fetch(
+            "filter",
+            f"{kind}:{value}",
+            lambda: self._get_json("filter", kind, value, "filter"),
+        )
+        return data or {}
+
+    async def _get_meal_details(self, meal_id: str) -> Optional[Dict[str, Any]]:
+        return await self._cached_fetch("lookup", meal_id, lambda: self._lookup_meal(meal_id))
+
+    async def _lookup_meal(self, meal_id: str) -> Optional[Dict[str, Any]]:
+        data = await self._get_json("lookup", "i", meal_id, "lookup")
+        meals = (data or {}).get("meals")
+        if isinstance(meals, list) and meals:
+            return meals[0]
         return None
 
     def _parse_meal(self, meal: Dict[str, Any]) -> Dict[str, Any]:
+        meal_id = meal.get("idMeal")
+        if self._parsed is not None and meal_id:
+            parsed = self._parsed.get(meal_id)
+            if parsed is None:
+                parsed = self._parsed[meal_id] = self._parse_meal_uncached(meal)
+            return parsed
+        return self._parse_meal_uncached(meal)
+
+    def _parse_meal_uncached(self, meal: Dict[str, Any]) -> Dict[str, Any]:
         ingredients = []
         ingredient_names = []
-        for idx in range(1, 21):
-            name = meal.get(f"strIngredient{idx}")
-            measure = meal.get(f"strMeasure{idx}")
-            if name and name.strip():
-                display = f"{measure.strip()} {name.strip()}" if measure and measure.strip() else name.strip()
-                ingredients.append(
-                    {
-                        "name": name.strip(),
-                        "measure": measure.strip() if measure and measure.strip() else None,
-                        "display": display.strip(),
-                    }
-                )
-                ingredient_names.append(name.strip().lower())
+        get = meal.get
+        for ing_key, meas_key in zip(_ING_KEYS, _MEAS_KEYS):
+            name = (get(ing_key) or "").strip()
+            if not name:
+                continue
+            measure = (get(meas_key) or "").strip() or None
+            ingredients.append(
+                {
+                    "name": name,
+                    "measure": measure,
+                    "display": f"{measure} {name}" if measure else name,
+                }
+            )
+            ingredient_names.append(name.lower())
 
         instructions_raw = meal.get("strInstructions") or ""
         instructions = [
@@ -272,27 +468,46 @@ class RecipeService:
             "cooking_time": estimated_time,
         }
 
+    @staticmethod
+    def _normalize_available(available_ingredients: List[str]) -> _AvailableIndex:
+        """Preprocess and index available names once per search."""
+        names = tuple(dict.fromkeys(_process_name(ing) for ing in available_ingredients))
+        return _AvailableIndex(
+            names=names,
+            whole=frozenset(names),
+            grams=frozenset(gram for name in names for gram in _word_grams(name)),
+        )
+
     def _calculate_match(
         self,
         recipe_ingredients: List[str],
-        available_ingredients: List[str],
+        available: _AvailableIndex,
     ) -> Dict[str, Any]:
-        available_set = {ing.lower() for ing in available_ingredients}
-        used = []
-        missed = []
+        """Split recipe ingredients into used/missed against :meth:`_normalize_available` output."""
+        processed = [_process_name(ing) for ing in recipe_ingredients]
+        matched = [_index_hit(name, available) for name in processed]
+
+        # Only ingredients the index could not settle go through the fuzzy batch
+        pending = [idx for idx, hit in enumerate(matched) if not hit]
+        if process is not None and pending and available.names:
+            scores = process.cdist(
+                [processed[idx] for idx in pending],
+                available.names,
+                scorer=fuzz.token_set_ratio,
+                score_cutoff=MATCH_SCORE_CUTOFF,
+            )
+            for idx, hit in zip(pending, (scores.max(axis=1) >= MATCH_SCORE_CUTOFF).tolist()):
+                matched[idx] = hit
 
-        for ingredient in recipe_ingredients:
-            if any(ingredient in avail or avail in ingredient for avail in available_set):
-                used.append({"name": ingredient})
-            else:
-                missed.append({"name": ingredient})
+        used = [name for name, hit in zip(recipe_ingredients, matched) if hit]
+        missed = [name for name, hit in zip(recipe_ingredients, matched) if not hit]
 
         total = len(recipe_ingredients)
         match_percentage = (len(used) / total * 100) if total else 0
 
         return {
-            "used": [item["name"] for item in used],
-            "missed": [item["name"] for item in missed],
+            "used": used,
+            "missed": missed,
             "match_percentage": round(match_percentage, 1),
         }
 
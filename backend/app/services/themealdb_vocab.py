@@ -0,0 +1,488 @@
+"""
+TheMealDB ingredient names (``list.php?i=list``), lower-cased.
+
+Regenerate with ``python -m scripts.refresh_themealdb_vocab`` from ``backend/``
+whenever TheMealDB adds ingredients.
+"""
+
+THEMEALDB_VOCAB = frozenset(
+    (
+        "allspice",
+        "almond extract",
+        "almond milk",
+        "almonds",
+        "anchovy fillet",
+        "apple",
+        "apple cider vinegar",
+        "apples",
+        "apricot",
+        "asparagus",
+        "aubergine",
+        "avocado",
+        "baby plum tomatoes",
+        "bacon",
+        "baguette",
+        "baking powder",
+        "balsamic vinegar",
+        "banana",
+        "bananas",
+        "barbeque sauce",
+        "basil",
+        "basil leaves",
+        "basmati rice",
+        "bay leaf",
+        "bay leaves",
+        "bean sprouts",
+        "beef",
+        "beef brisket",
+        "beef fillet",
+        "beef gravy",
+        "beef stock",
+        "bicarbonate of soda",
+        "biryani masala",
+        "black beans",
+        "black olives",
+        "black pepper",
+        "black treacle",
+        "blackberries",
+        "blueberries",
+        "bok choy",
+        "borlotti beans",
+        "bowtie pasta",
+        "bramley apples",
+        "brandy",
+        "bread",
+        "bread rolls",
+        "breadcrumbs",
+        "brie",
+        "broccoli",
+        "brown lentils",
+        "brown rice",
+        "brown sugar",
+        "bulgur wheat",
+        "buns",
+        "butter",
+        "butter beans",
+        "butternut squash",
+        "cabbage",
+        "cacao",
+        "cajun",
+        "canned tomatoes",
+        "cannellini beans",
+        "capers",
+        "caraway seed",
+        "cardamom",
+        "carrot",
+        "carrots",
+        "cashew nuts",
+        "cashews",
+        "caster sugar",
+        "cauliflower",
+        "cayenne pepper",
+        "celeriac",
+        "celery",
+        "celery salt",
+        "challots",
+        "champignons",
+        "charlotte potatoes",
+        "cheddar cheese",
+        "cheese",
+        "cheese curds",
+        "cherry",
+        "cherry tomatoes",
+        "chestnut mushroom",
+        "chicken",
+        "chicken breast",
+        "chicken breasts",
+        "chicken legs",
+        "chicken stock",
+        "chicken thighs",
+        "chickpeas",
+        "chili powder",
+        "chilli",
+        "chilli powder",
+        "chinese broccoli",
+        "chives",
+        "chocolate",
+        "chocolate chips",
+        "chopped onion",
+        "chopped parsley",
+        "chopped tomatoes",
+        "chorizo",
+        "christmas pudding",
+        "cider",
+        "cinnamon",
+        "cinnamon stick",
+        "clams",
+        "clotted cream",
+        "cloves",
+        "coco sugar",
+        "cocoa",
+        "coconut",
+        "coconut cream",
+        "coconut milk",
+        "coconut oil",
+        "cod",
+        "condensed milk",
+        "coriander",
+        "coriander leaves",
+        "coriander seeds",
+        "corn",
+        "corn flour",
+        "corn tortillas",
+        "cornstarch",
+        "courgettes",
+        "couscous",
+        "crab",
+        "cranberries",
+        "cream",
+        "cream cheese",
+        "creme fraiche",
+        "cucumber",
+        "cumin",
+        "cumin seeds",
+        "curry powder",
+        "custard",
+        "dark brown sugar",
+        "dark chocolate",
+        "dates",
+        "demerara sugar",
+        "desiccated coconut",
+        "digestive biscuits",
+        "dijon mustard",
+        "dill",
+        "doner meat",
+        "double cream",
+        "double gloucester cheese",
+        "dried apricots",
+        "dried fruit",
+        "dried oregano",
+        "duck",
+        "duck fat",
+        "egg",
+        "egg noodles",
+        "egg plants",
+        "egg white",
+        "egg yolks",
+        "eggs",
+        "enchilada sauce",
+        "english mustard",
+        "extra virgin olive oil",
+        "fajita seasoning",
+        "farfalle",
+        "fennel",
+        "fennel bulb",
+        "fennel seeds",
+        "fenugreek",
+        "feta",
+        "fettuccine",
+        "figs",
+        "fish sauce",
+        "fish stock",
+        "flaked almonds",
+        "flax eggs",
+        "flour",
+        "flour tortilla",
+        "floury potatoes",
+        "free-range egg, beaten",
+        "free-range eggs, beaten",
+        "french lentils",
+        "fresh basil",
+        "fresh thyme",
+        "freshly chopped parsley",
+        "fries",
+        "full fat yogurt",
+        "garam masala",
+        "garlic",
+        "garlic clove",
+        "garlic cloves",
+        "garlic powder",
+        "garlic salt",
+        "garlic sauce",
+        "gelatine leaves",
+        "ghee",
+        "gherkins",
+        "ginger",
+        "ginger cordial",
+        "ginger paste",
+        "goat meat",
+        "golden caster sugar",
+        "golden syrup",
+        "goose fat",
+        "gouda cheese",
+        "granulated sugar",
+        "grape tomatoes",
+        "grapes",
+        "gravy",
+        "greek yogurt",
+        "green beans",
+        "green chilli",
+        "green olives",
+        "green pepper",
+        "green red lentils",
+        "green salsa",
+        "ground almonds",
+        "ground beef",
+        "ground cinnamon",
+        "ground coriander",
+        "ground cumin",
+        "ground ginger",
+        "ground pork",
+        "gruyère",
+        "haddock",
+        "ham",
+        "hard taco shells",
+        "harissa spice",
+        "hazelnuts",
+        "heavy cream",
+        "hoisin sauce",
+        "honey",
+        "horseradish",
+        "hot beef stock",
+        "hotsauce",
+        "ice cream",
+        "icing sugar",
+        "italian fennel sausages",
+        "italian seasoning",
+        "jalapeno",
+        "jam",
+        "jasmine rice",
+        "jerusalem artichokes",
+        "kale",
+        "khus khus",
+        "kidney beans",
+        "king prawns",
+        "kosher salt",
+        "lamb",
+        "lamb loin chops",
+        "lamb mince",
+        "lamb shoulder",
+        "lard",
+        "lasagne sheets",
+        "lean minced beef",
+        "leek",
+        "lemon",
+        "lemon juice",
+        "lemon zest",
+        "lemongrass",
+        "lemons",
+        "lentils",
+        "lettuce",
+        "lime",
+        "lime juice",
+        "linguine pasta",
+        "little gem lettuce",
+        "macaroni",
+        "mackerel",
+        "madras paste",
+        "malt vinegar",
+        "mango",
+        "maple syrup",
+        "marjoram",
+        "mars bar",
+        "mascarpone",
+        "mayonnaise",
+        "meringue nests",
+        "milk",
+        "milk chocolate",
+        "mince",
+        "minced garlic",
+        "minced pork",
+        "mint",
+        "mirin",
+        "mixed grain",
+        "mixed spice",
+        "monterey jack cheese",
+        "mozzarella",
+        "mozzarella balls",
+        "mozzarella cheese",
+        "muscovado sugar",
+        "mushroom",
+        "mushrooms",
+        "mussels",
+        "mustard",
+        "mustard powder",
+        "mustard seeds",
+        "noodles",
+        "nutmeg",
+        "oatmeal",
+        "oats",
+        "oil",
+        "olive oil",
+        "olives",
+        "onion",
+        "onion salt",
+        "onions",
+        "orange",
+        "orange zest",
+        "oregano",
+        "oyster mushrooms",
+        "oyster sauce",
+        "oysters",
+        "pak choi",
+        "pancetta",
+        "paneer",
+        "paprika",
+        "parma ham",
+        "parmesan",
+        "parmesan cheese",
+        "parmigiano-reggiano",
+        "parsley",
+        "passata",
+        "pasta",
+        "pastry",
+        "peaches",
+        "peanut brittle",
+        "peanut butter",
+        "peanut oil",
+        "peanuts",
+        "pears",
+        "peas",
+        "pecan nuts",
+        "pecans",
+        "pecorino",
+        "penne rigate",
+        "pepper",
+        "pickle juice",
+        "pine nuts",
+        "pineapple",
+        "pita bread",
+        "pitted black olives",
+        "plain chocolate",
+        "plain flour",
+        "plum tomatoes",
+        "plums",
+        "polenta",
+        "pork",
+        "pork chops",
+        "potato",
+        "potato starch",
+        "potatoes",
+        "prawns",
+        "pretzels",
+        "puff pastry",
+        "pumpkin",
+        "quinoa",
+        "raisins",
+        "raspberries",
+        "raspberry jam",
+        "raw king prawns",
+        "red chilli",
+        "red chilli flakes",
+        "red chilli powder",
+        "red onions",
+        "red pepper",
+        "red pepper flakes",
+        "red snapper",
+        "red wine",
+        "red wine vinegar",
+        "refried beans",
+        "rhubarb",
+        "rice",
+        "rice noodles",
+        "rice stick noodles",
+        "rice vermicelli",
+        "ricotta",
+        "rigatoni",
+        "risotto rice",
+        "rocket",
+        "rolled oats",
+        "rosemary",
+        "rum",
+        "saffron",
+        "sage",
+        "sake",
+        "salami",
+        "salmon",
+        "salsa",
+        "salt",
+        "salted butter",
+        "sardines",
+        "sausages",
+        "scallops",
+        "sea salt",
+        "self-raising flour",
+        "semi-skimmed milk",
+        "sesame seed",
+        "sesame seed oil",
+        "shallots",
+        "shiitake mushrooms",
+        "shredded mexican cheese",
+        "shredded monterey jack cheese",
+        "shrimp",
+        "silken tofu",
+        "single cream",
+        "sirloin steak",
+        "small potatoes",
+        "smoked paprika",
+        "smoked salmon",
+        "smoky paprika",
+        "sour cream",
+        "soy sauce",
+        "soya milk",
+        "spaghetti",
+        "spinach",
+        "spring onions",
+        "squash",
+        "squid",
+        "steak",
+        "stilton cheese",
+        "stir-fry vegetables",
+        "strawberries",
+        "sugar",
+        "sultanas",
+        "sunflower oil",
+        "sweet corn",
+        "sweet potatoes",
+        "sweetcorn",
+        "tagliatelle",
+        "tahini",
+        "tamarind ball",
+        "tamarind paste",
+        "tarragon leaves",
+        "thai fish sauce",
+        "thai green curry paste",
+        "thai red curry paste",
+        "thyme",
+        "tofu",
+        "tomato",
+        "tomato ketchup",
+        "tomato puree",
+        "tomato sauce",
+        "tomatoes",
+        "toor dal",
+        "tortillas",
+        "trout",
+        "tuna",
+        "turkey",
+        "turmeric",
+        "turmeric powder",
+        "turnips",
+        "udon noodles",
+        "vanilla",
+        "vanilla extract",
+        "veal",
+        "vegan butter",
+        "vegetable oil",
+        "vegetable stock",
+        "vegetable stock cube",
+        "vinaigrette dressing",
+        "vine leaves",
+        "vinegar",
+        "walnuts",
+        "water",
+        "white chocolate chips",
+        "white fish",
+        "white fish fillets",
+        "white rice",
+        "white vinegar",
+        "white wine",
+        "whole milk",
+        "whole wheat",
+        "wholegrain bread",
+        "worcestershire sauce",
+        "yeast",
+        "yogurt",
+        "zucchini",
+    )
+)
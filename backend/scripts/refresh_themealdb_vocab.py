@@ -0,0 +1,55 @@
+"""Regenerate app/services/themealdb_vocab.py from TheMealDB's ingredient list."""
+
+from pathlib import Path
+from typing import Iterable
+
+import httpx
+
+from app.core.config import settings
+
+
+VOCAB_PATH = Path(__file__).resolve().parents[1] / "app" / "services" / "themealdb_vocab.py"
+
+
+def render(names: Iterable[str]) -> str:
+    """Return the module source for a set of ingredient names."""
+
+    body = "\n".join(f'        "{name}",' for name in sorted(set(names)))
+    return f'''"""
+TheMealDB ingredient names (``list.php?i=list``), lower-cased.
+
+Regenerate with ``python -m scripts.refresh_themealdb_vocab`` from ``backend/``
+whenever TheMealDB adds ingredients.
+"""
+
+THEMEALDB_VOCAB = frozenset(
+    (
+{body}
+    )
+)
+'''
+
+
+def refresh_vocab() -> None:
+    """Fetch the current ingredient list and rewrite the vocabulary module."""
+
+    resp = httpx.get(
+        f"{settings.THEMEALDB_BASE_URL.rstrip('/')}/list.php",
+        params={"i": "list"},
+        timeout=30.0,
+    )
+    resp.raise_for_status()
+    names = {
+        item["strIngredient"].strip().lower()
+        for item in resp.json().get("meals") or []
+        if item.get("strIngredient")
+    }
+    if not names:
+        raise SystemExit("TheMealDB returned no ingredients; vocabulary left unchanged.")
+
+    VOCAB_PATH.write_text(render(names), encoding="utf-8")
+    print(f"Wrote {len(names)} ingredients to {VOCAB_PATH}.")
+
+
+if __name__ == "__main__":
+    refresh_vocab()
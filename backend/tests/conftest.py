@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# Settings require a Mongo target; tests never connect to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_DB", "fridgescan_test")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,27 @@
+from app.services.detection_service import _CATEGORY_LABELS
+from app.services.themealdb_vocab import THEMEALDB_VOCAB
+
+
+# Detector labels TheMealDB has no ingredient for under the same name
+NO_THEMEALDB_EQUIVALENT = {
+    "blue berry",  # listed as "blueberries"
+    "stawberry",  # misspelt model class
+    "strawberry",  # listed as "strawberries"
+    "brinjal",  # listed as "aubergine"
+    "capsicum",
+    "green chilly",
+    "green leaves",
+    "fresh cream",
+    "meat",
+    "sweet potato",  # listed as "sweet potatoes"
+}
+
+
+def test_detector_labels_are_in_vocab():
+    labels = {label for group in _CATEGORY_LABELS.values() for label in group}
+    missing = sorted(labels - NO_THEMEALDB_EQUIVALENT - THEMEALDB_VOCAB)
+    assert not missing, f"detector labels missing from THEMEALDB_VOCAB: {missing}"
+
+
+def test_vocab_is_normalized():
+    assert all(name == name.strip().lower() for name in THEMEALDB_VOCAB)